@@ -0,0 +1,221 @@
+from multiprocessing import Pool
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+# Rounds of parallel peeling in peel_chain before it finishes any segments
+# still peeling with a sequential pass; random and circular inputs of a
+# million points take at most 8
+PEEL_ROUNDS = 16
+
+
+def _cross(o: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Row-wise cross product of (a - o) and (b - o): positive when o, a, b turn
+    to the left as drawn with the y-axis pointing up (i.e. when
+    `is_clockwise(o, a, b)` holds in convex_hull.py).
+    """
+    return (a[:, 0] - o[:, 0]) * (b[:, 1] - o[:, 1]) - (a[:, 1] - o[:, 1]) * (
+        b[:, 0] - o[:, 0]
+    )
+
+
+def _segment_ids(offsets: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def segment_argmax(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Given values grouped into contiguous non-empty segments beginning at
+    `starts` (in increasing order, the first at 0), returns the index of the
+    first maximum of every segment. Negate the values for the minimum.
+    """
+    counts = np.diff(np.r_[starts, len(values)])
+    maxima = np.maximum.reduceat(values, starts)
+    hits = np.flatnonzero(values == np.repeat(maxima, counts))
+    # The first hit at or after each segment start belongs to that segment
+    return hits[np.searchsorted(hits, starts)]
+
+
+def discard_interior(
+    x: np.ndarray, y: np.ndarray, segments: np.ndarray
+) -> np.ndarray:
+    """
+    Akl-Toussaint heuristic: returns a mask of the points that are not
+    strictly inside the octagon spanned by the extreme points of their segment
+    in the eight compass directions. Only the masked points can be on a hull.
+
+    `segments` gives the segment of every point; the points of a segment
+    must be contiguous, but need not be sorted.
+    """
+    starts = np.flatnonzero(np.r_[True, segments[1:] != segments[:-1]])
+    # Position of every point's segment among the non-empty segments
+    owner = np.cumsum(np.r_[False, segments[1:] != segments[:-1]])
+
+    # Extreme points in counter-clockwise order of direction (y-axis up)
+    keys = [x, x + y, y, y - x, -x, -x - y, -y, x - y]
+    corners = [segment_argmax(key, starts) for key in keys]
+
+    interior = np.ones(len(x), dtype=bool)
+    proper = np.zeros(len(starts), dtype=bool)
+    for a, b in zip(corners, corners[1:] + corners[:1]):
+        # Edge a->b as the line dx * (py - ay) - dy * (px - ax) = 0, which is
+        # positive to the left of the edge
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        offset = dy * x[a] - dx * y[a]
+        degenerate = (dx == 0) & (dy == 0)
+        proper |= ~degenerate
+        offset[degenerate] = 1
+        interior &= dx[owner] * y - dy[owner] * x + offset[owner] > 0
+    return ~(interior & proper[owner])
+
+
+def peel_chain(xy: np.ndarray, segments: np.ndarray, sign: int) -> np.ndarray:
+    """
+    Returns the indices of the lower (sign=1) or upper (sign=-1) chain
+    vertices of every segment, for distinct points sorted by (segment, x, y)
+    with `segments` giving the segment of each.
+
+    Each round removes, in parallel, every point that does not turn strictly
+    the right way with its current neighbours. Such a point lies on or under
+    the segment joining two other points, so it cannot be on the chain, and
+    the rounds stop once every remaining triple is strictly convex. Removing
+    a point can expose only its neighbours, so a cascade can take a round
+    per point: after PEEL_ROUNDS rounds, the segments still peeling are
+    finished by `_monotone_chain` instead.
+    """
+    keep = np.arange(len(xy))
+    peeling = segments
+    for _ in range(PEEL_ROUNDS):
+        if len(keep) < 3:
+            return keep
+        points = xy[keep]
+        owner = segments[keep]
+        same = (owner[:-2] == owner[1:-1]) & (owner[1:-1] == owner[2:])
+        turn = sign * _cross(points[:-2], points[1:-1], points[2:])
+        reflex = same & (turn <= 0)
+        if not reflex.any():
+            return keep
+        peeling = owner[1:-1][reflex]
+        mask = np.ones(len(keep), dtype=bool)
+        mask[1:-1] = ~reflex
+        keep = keep[mask]
+
+    peeling = np.isin(segments[keep], peeling)
+    rest = keep[peeling]
+    chain = rest[_monotone_chain(xy[rest], segments[rest], sign)]
+    return np.sort(np.concatenate([keep[~peeling], chain]))
+
+
+def _monotone_chain(xy: np.ndarray, segments: np.ndarray, sign: int) -> np.ndarray:
+    """
+    Sequential form of `peel_chain`: Andrew's monotone chain over every
+    segment in one pass with a stack, in O(n) for any input.
+    """
+    points = xy.tolist()
+    owners = segments.tolist()
+    chain = []
+    for i, (x, y) in enumerate(points):
+        # Same arithmetic as _cross, so float inputs give the same chain
+        while len(chain) >= 2 and owners[chain[-2]] == owners[i]:
+            (ox, oy), (ax, ay) = points[chain[-2]], points[chain[-1]]
+            if sign * ((ax - ox) * (y - oy) - (ay - oy) * (x - ox)) > 0:
+                break
+            chain.pop()
+        chain.append(i)
+    return np.array(chain, dtype=np.intp)
+
+
+def _batch_hulls(
+    offsets: np.ndarray, coords: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Single-process implementation of `batch_hulls`."""
+    if not len(coords):
+        return np.zeros(len(offsets), dtype=np.intp), coords
+    segments = _segment_ids(offsets)
+
+    # Filtering first leaves only a fraction of the points to sort
+    candidates = discard_interior(coords[:, 0], coords[:, 1], segments)
+    xy, segments = coords[candidates], segments[candidates]
+
+    order = np.lexsort((xy[:, 1], xy[:, 0], segments))
+    xy, segments = xy[order], segments[order]
+
+    # Drop repeated points within a segment
+    unique = np.r_[
+        True,
+        (segments[1:] != segments[:-1])
+        | (xy[1:, 0] != xy[:-1, 0])
+        | (xy[1:, 1] != xy[:-1, 1]),
+    ]
+    xy, segments = xy[unique], segments[unique]
+
+    lower = peel_chain(xy, segments, 1)
+    upper = peel_chain(xy, segments, -1)
+
+    # The upper chain is walked backwards, without the endpoints it shares
+    # with the lower chain
+    upper_owner = segments[upper]
+    first = np.r_[True, upper_owner[1:] != upper_owner[:-1]]
+    last = np.r_[upper_owner[1:] != upper_owner[:-1], True]
+    upper = upper[~(first | last)]
+
+    owner = np.concatenate([segments[lower], segments[upper]])
+    part = np.concatenate([np.zeros(len(lower), int), np.ones(len(upper), int)])
+    position = np.concatenate([np.arange(len(lower)), -np.arange(len(upper))])
+    hull_order = np.lexsort((position, part, owner))
+
+    hull_coords = np.concatenate([xy[lower], xy[upper]])[hull_order]
+    counts = np.bincount(owner, minlength=len(offsets) - 1)
+    hull_offsets = np.concatenate([[0], np.cumsum(counts)])
+    return hull_offsets, hull_coords
+
+
+def batch_hulls(
+    offsets: np.ndarray, coords: np.ndarray, processes: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the convex hulls of many point sets at once.
+
+    The point sets are given as a ragged array: set i consists of the rows
+    coords[offsets[i]:offsets[i + 1]] of an (n, 2) coordinate array. The hulls
+    are returned in the same layout, each in clockwise order starting from its
+    leftmost (then lowest) vertex, exactly as `chan_hull` would return them.
+
+    All sets are processed together by whole-array NumPy operations. With
+    `processes`, the sets are additionally split across a process pool.
+    Integer coordinates are handled exactly in int64, so they should stay
+    below 2^30 in magnitude.
+    """
+    offsets = np.asarray(offsets, dtype=np.intp)
+    coords = np.asarray(coords).reshape(-1, 2)
+    if coords.dtype.kind in "iub":
+        coords = coords.astype(np.int64)
+
+    num_sets = len(offsets) - 1
+    if not processes or processes <= 1 or num_sets < 2 * processes:
+        return _batch_hulls(offsets - offsets[0], coords[offsets[0] : offsets[-1]])
+
+    # A few chunks per process balances uneven set sizes
+    bounds = np.linspace(0, num_sets, 4 * processes + 1).astype(np.intp)
+    tasks = [
+        (offsets[i : j + 1] - offsets[i], coords[offsets[i] : offsets[j]])
+        for i, j in zip(bounds[:-1], bounds[1:])
+    ]
+    with Pool(processes) as pool:
+        results = pool.starmap(_batch_hulls, tasks)
+
+    hull_coords = np.concatenate([chunk_coords for _, chunk_coords in results])
+    counts = np.concatenate([np.diff(chunk_offsets) for chunk_offsets, _ in results])
+    hull_offsets = np.concatenate([[0], np.cumsum(counts)])
+    return hull_offsets, hull_coords
+
+
+def hull_array(coords: np.ndarray) -> np.ndarray:
+    """
+    Vectorized hull of a single (n, 2) coordinate array: returns the (h, 2)
+    array of hull vertices in clockwise order.
+    """
+    coords = np.asarray(coords).reshape(-1, 2)
+    return batch_hulls(np.array([0, len(coords)]), coords)[1]
@@ -1,13 +1,27 @@
+import argparse
+import csv
+import json
+import math
+import sys
 import time
-from random import randint
+import tracemalloc
+from statistics import mean
+from statistics import median
+from typing import Callable
+from typing import Dict
 from typing import List
-from typing import Set
+from typing import Optional
 
-import matplotlib.pyplot as plt
+import numpy as np
 
+from batch_hull import hull_array
 from convex_hull import Point
 from convex_hull import base_case_hull
+from convex_hull import chan_hull
 from convex_hull import compute_hull
+from convex_hull import sort_clockwise
+from hull3d import hull3d
+from incremental_hull import IncrementalHull
 
 
 def generate_points(
@@ -16,6 +30,7 @@ def generate_points(
         max_x: int = 1_000,
         min_y: int = 0,
         max_y: int = 1_000,
+        rng: Optional[np.random.Generator] = None,
 ) -> List[Point]:
     """ Creates a list of random and unique points for benchmarking the convex_hull algorithm.
 
@@ -24,14 +39,224 @@ def generate_points(
     :param max_x: maximum x-coordinate for points
     :param min_y: minimum y-coordinate for points
     :param max_y: maximum y-coordinate for points
+    :param rng: random generator to draw from (a fresh one by default)
     """
-    points: Set[Point] = set()
+    rng = rng or np.random.default_rng()
+    points = np.empty((0, 2), dtype=np.int64)
     while len(points) < num_points:
-        points.add((randint(min_x, max_x), randint(min_y, max_y)))
-    return list(points)
+        # Draw whole batches and drop repeats until there are enough points
+        batch = np.stack([
+            rng.integers(min_x, max_x, size=num_points, endpoint=True),
+            rng.integers(min_y, max_y, size=num_points, endpoint=True),
+        ], axis=1)
+        points = np.unique(np.concatenate([points, batch]), axis=0)
+    points = rng.permutation(points)[:num_points]
+    return list(map(tuple, points.tolist()))
+
+
+# Point distributions, each returning an (n, dim) int64 array of coordinates
+# within [-SCALE, SCALE]. The expected hull size h varies from O(log n) to n.
+SCALE = 1 << 24
+
+
+def uniform_square(n: int, rng: np.random.Generator, dim: int = 2) -> np.ndarray:
+    """Uniform in a square (or cube): h = O(log^(dim - 1) n)."""
+    return rng.integers(-SCALE, SCALE, size=(n, dim), endpoint=True)
+
+
+def uniform_disk(n: int, rng: np.random.Generator, dim: int = 2) -> np.ndarray:
+    """Uniform in a disk (or ball): h = O(n^((dim - 1) / (dim + 1)))."""
+    radius = SCALE * rng.random(n) ** (1 / dim)
+    return _round(_directions(n, rng, dim) * radius[:, None])
+
+
+def circle(n: int, rng: np.random.Generator, dim: int = 2) -> np.ndarray:
+    """On a circle (or sphere): h = Θ(n), though rounding to integers hides some points."""
+    return _round(SCALE * _directions(n, rng, dim))
+
+
+def gaussian(n: int, rng: np.random.Generator, dim: int = 2) -> np.ndarray:
+    """Normally distributed: h = O(log^((dim - 1) / 2) n)."""
+    return _round(np.clip(rng.normal(0, SCALE / 4, (n, dim)), -SCALE, SCALE))
+
+
+def clustered(
+        n: int, rng: np.random.Generator, dim: int = 2, clusters: int = 16
+) -> np.ndarray:
+    """Gaussian blobs around uniformly placed centres."""
+    centres = rng.uniform(-SCALE / 2, SCALE / 2, (clusters, dim))
+    points = centres[rng.integers(0, clusters, n)]
+    points += rng.normal(0, SCALE / 32, (n, dim))
+    return _round(np.clip(points, -SCALE, SCALE))
+
+
+def _directions(n: int, rng: np.random.Generator, dim: int) -> np.ndarray:
+    """Uniformly random unit vectors."""
+    directions = rng.normal(size=(n, dim))
+    return directions / np.linalg.norm(directions, axis=1, keepdims=True)
+
+
+def _round(coords: np.ndarray) -> np.ndarray:
+    return np.rint(coords).astype(np.int64)
+
+
+DISTRIBUTIONS: Dict[str, Callable[..., np.ndarray]] = {
+    'square': uniform_square,
+    'disk': uniform_disk,
+    'circle': circle,
+    'gaussian': gaussian,
+    'clustered': clustered,
+}
+
+
+def atan2_sort_clockwise(points: List[Point]):
+    """The original trigonometric sort_clockwise, kept as a reference"""
+    centroid_x = sum(p[0] for p in points) / len(points)
+    centroid_y = sum(p[1] for p in points) / len(points)
+
+    def sort_key(point: Point):
+        angle = math.atan2(point[1] - centroid_y, point[0] - centroid_x)
+        return ((angle + math.tau) % math.tau, point[0], point[1])
+
+    points.sort(key=sort_key)
+
+
+def _sorted(sort: Callable[[List[Point]], None], points: List[Point]) -> List[Point]:
+    """Sorts a copy of `points` in place with `sort`, and returns it."""
+    points = list(points)
+    sort(points)
+    return points
+
+
+# Hull algorithms, each taking the coordinate array and its list of points
+ALGORITHMS: Dict[str, Callable[[np.ndarray, List[Point]], object]] = {
+    'naive': lambda coords, points: base_case_hull(points),
+    'dnc': lambda coords, points: compute_hull(points),
+    'chan': lambda coords, points: chan_hull(points),
+    'incremental': lambda coords, points: IncrementalHull(points).hull(),
+    'numpy': lambda coords, points: hull_array(coords),
+    'hull3d': lambda coords, points: hull3d(coords),
+    # Not hulls: the clockwise sort, against the atan2 sort it replaced
+    'sort': lambda coords, points: _sorted(sort_clockwise, points),
+    'sort_atan2': lambda coords, points: _sorted(atan2_sort_clockwise, points),
+}
+
+# Algorithms that run on points in more than two dimensions
+DIMENSIONS = {'hull3d': 3}
+
+# The naive algorithm is O(n^3), so larger inputs are skipped
+MAX_SIZES = {'naive': 100}
+
+
+def time_algorithm(
+        algorithm: Callable[[np.ndarray, List[Point]], object],
+        coords: np.ndarray,
+        repeats: int = 5,
+        warmup: int = 1,
+) -> Dict[str, float]:
+    """ Times `algorithm` on one input and measures its peak memory use.
+
+    :param algorithm: one of the ALGORITHMS
+    :param coords: the input, as an (n, dim) array
+    :param repeats: number of timed runs, at least 1
+    :param warmup: number of untimed runs beforehand
+    """
+    if repeats < 1:
+        raise ValueError(f"repeats must be at least 1, not {repeats}")
+    points = list(map(tuple, coords.tolist()))
+    for _ in range(warmup):
+        algorithm(coords, points)
+
+    times: List[float] = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        hull = algorithm(coords, points)
+        times.append(time.perf_counter() - start_time)
+
+    # Tracing slows everything down, so memory gets a run of its own
+    tracemalloc.start()
+    algorithm(coords, points)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'h': len(hull),
+        'min_s': min(times),
+        'median_s': median(times),
+        'mean_s': mean(times),
+        'peak_bytes': peak,
+    }
+
+
+def run_suite(
+        algorithms: List[str],
+        distributions: List[str],
+        sizes: List[int],
+        repeats: int = 5,
+        warmup: int = 1,
+        seed: int = 0,
+) -> List[Dict[str, object]]:
+    """ Benchmarks every algorithm on every distribution and size.
+
+    All algorithms of the same dimension see the same points for a given
+    distribution, size and seed. Returns one record per measurement.
+    """
+    results: List[Dict[str, object]] = []
+    for distribution in distributions:
+        for n in sizes:
+            inputs: Dict[int, np.ndarray] = {}
+            for algorithm in algorithms:
+                if n > MAX_SIZES.get(algorithm, n):
+                    continue
+                dim = DIMENSIONS.get(algorithm, 2)
+                if dim not in inputs:
+                    generate = DISTRIBUTIONS[distribution]
+                    inputs[dim] = generate(n, np.random.default_rng(seed), dim)
+                coords = inputs[dim]
+                record = {'algorithm': algorithm, 'distribution': distribution,
+                          'dim': dim, 'n': n}
+                record.update(
+                    time_algorithm(ALGORITHMS[algorithm], coords, repeats, warmup)
+                )
+                print(
+                    f"{algorithm} {distribution} n={n} h={record['h']}: "
+                    f"{record['median_s']:.4f}s",
+                    file=sys.stderr,
+                )
+                results.append(record)
+    return results
+
+
+def write_results(results: List[Dict[str, object]], output_format: str, file):
+    """Writes benchmark records to `file` as JSON or CSV."""
+    if output_format == 'json':
+        json.dump(results, file, indent=2)
+        file.write('\n')
+    else:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]) if results else [])
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def plot_results(results: List[Dict[str, object]], path: str):
+    """Plots runtime against input size, one line per algorithm and distribution."""
+    import matplotlib.pyplot as plt
+
+    plt.clf()
+    for key in sorted({(r['algorithm'], r['distribution']) for r in results}):
+        rows = [r for r in results if (r['algorithm'], r['distribution']) == key]
+        plt.plot([r['n'] for r in rows], [r['median_s'] for r in rows],
+                 marker='o', label=' / '.join(key))
+    plt.legend()
+    plt.xlabel('Input size (n)')
+    plt.ylabel('Runtime (s)')
+    plt.title('Convex Hull Runtime')
+    plt.savefig(path)
 
 
 def run_benchmarks():
+    import matplotlib.pyplot as plt
+
     # TODO: Generate points randomly, run your convex hull function,
     #  and record the time it takes on inputs of different sizes.
     # TODO: Plot a graph of runtime vs input size. What can you infer from the shape?
@@ -46,9 +271,9 @@ def run_benchmarks():
 
         points = generate_points(n)
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         base_case_hull(points)
-        time_taken = time.time() - start_time  # time taken (in seconds) for naive
+        time_taken = time.perf_counter() - start_time  # time taken (in seconds) for naive
 
         print(f'naive_time_taken: {time_taken:.3f}')
         naive_hull_times.append(time_taken)
@@ -67,9 +292,9 @@ def run_benchmarks():
         print(f'n: {n},', end=' ')
 
         points = generate_points(n)
-        start_time = time.time()
+        start_time = time.perf_counter()
         compute_hull(points)
-        time_taken = time.time() - start_time  # time taken (in seconds) for divide-and-conquer
+        time_taken = time.perf_counter() - start_time  # time taken (in seconds) for divide-and-conquer
 
         print(f'dnc_time_taken: {time_taken:.3f},', end=' ')
         dnc_hull_times.append(time_taken)
@@ -85,5 +310,82 @@ def run_benchmarks():
     return
 
 
+def run_output_sensitive_benchmarks():
+    import matplotlib.pyplot as plt
+
+    # Uniform points in a square have O(log n) hull vertices, so h << n
+    plt.clf()
+
+    sizes: List[int] = list(range(0, 1_000_000, 50_000))
+    dnc_hull_times: List[float] = list()
+    chan_hull_times: List[float] = list()
+
+    for n in sizes:
+        print(f'n: {n},', end=' ')
+
+        points = generate_points(n, max_x=10_000_000, max_y=10_000_000)
+
+        start_time = time.perf_counter()
+        compute_hull(points)
+        dnc_time_taken = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        hull = chan_hull(points)
+        chan_time_taken = time.perf_counter() - start_time
+
+        print(f'h: {len(hull)}, dnc_time_taken: {dnc_time_taken:.3f}, chan_time_taken: {chan_time_taken:.3f}')
+        dnc_hull_times.append(dnc_time_taken)
+        chan_hull_times.append(chan_time_taken)
+
+    plt.scatter(sizes, dnc_hull_times, c='blue')
+    plt.plot(sizes, dnc_hull_times, c='blue', label='divide and conquer')
+    plt.scatter(sizes, chan_hull_times, c='green')
+    plt.plot(sizes, chan_hull_times, c='green', label='Chan')
+    plt.legend()
+    plt.xlabel('Input size (n)')
+    plt.ylabel('Runtime (s)')
+    plt.title('Convex Hull Time Complexity: DNC vs Chan (h << n)')
+    plt.savefig('benchmark_plot_c.png')
+
+    return
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark the convex hull algorithms.')
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS),
+                        default=['dnc', 'chan', 'numpy'])
+    parser.add_argument('--distributions', nargs='+', choices=list(DISTRIBUTIONS),
+                        default=list(DISTRIBUTIONS))
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--output', help='file to write results to (default: stdout)')
+    parser.add_argument('--plot', help='also save a runtime plot to this PNG file')
+    parser.add_argument('--legacy', action='store_true',
+                        help='run the original plotting benchmarks instead')
+    args = parser.parse_args(argv)
+    if args.repeats < 1:
+        parser.error('--repeats must be at least 1')
+
+    if args.legacy:
+        run_benchmarks()
+        run_output_sensitive_benchmarks()
+        return
+
+    results = run_suite(args.algorithms, args.distributions, args.sizes,
+                        args.repeats, args.warmup, args.seed)
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            write_results(results, args.format, file)
+    else:
+        write_results(results, args.format, sys.stdout)
+    if args.plot:
+        plot_results(results, args.plot)
+    return
+
+
 if __name__ == '__main__':
-    run_benchmarks()
+    main()
@@ -0,0 +1,296 @@
+from math import sqrt
+from typing import List
+from typing import Tuple
+
+import numpy as np
+
+from batch_hull import segment_argmax
+from convex_hull import Point
+from convex_hull import triangle_area
+
+Rectangle = List[Tuple[float, float]]
+
+
+def _height(hull: List[Point], i: int, j: int) -> float:
+    """Twice the distance of hull[j] from the line through edge i, times its length."""
+    h = len(hull)
+    return -2 * triangle_area(hull[i], hull[(i + 1) % h], hull[j])
+
+
+def _projection(hull: List[Point], i: int, j: int) -> int:
+    """Projection of hull[j] onto edge i, times the edge's length."""
+    h = len(hull)
+    (ax, ay), (bx, by) = hull[i], hull[(i + 1) % h]
+    return (bx - ax) * hull[j][0] + (by - ay) * hull[j][1]
+
+
+def _squared_distance(p: Point, q: Point) -> int:
+    return (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2
+
+
+def _calipers(hull: List[Point]):
+    """
+    Rotates a caliper around a clockwise hull (as returned by `compute_hull`)
+    with at least three vertices. Yields, for every edge i, the indices of the
+    vertices that are furthest from it and furthest forwards and backwards
+    along it, as (i, apex, front, back).
+
+    All three vertices only ever move forwards around the hull, so the whole
+    rotation takes O(h) steps.
+    """
+    h = len(hull)
+    front = 1
+    while _projection(hull, 0, (front + 1) % h) > _projection(hull, 0, front):
+        front = (front + 1) % h
+    apex = front
+    while _height(hull, 0, (apex + 1) % h) > _height(hull, 0, apex):
+        apex = (apex + 1) % h
+    back = apex
+    while _projection(hull, 0, (back + 1) % h) < _projection(hull, 0, back):
+        back = (back + 1) % h
+
+    for i in range(h):
+        while _projection(hull, i, (front + 1) % h) > _projection(hull, i, front):
+            front = (front + 1) % h
+        while _height(hull, i, (apex + 1) % h) > _height(hull, i, apex):
+            apex = (apex + 1) % h
+        while _projection(hull, i, (back + 1) % h) < _projection(hull, i, back):
+            back = (back + 1) % h
+        yield i, apex, front, back
+
+
+def antipodal_pairs(hull: List[Point]) -> List[Tuple[Point, Point]]:
+    """
+    Returns every antipodal pair of vertices of a clockwise hull, i.e. every
+    pair that admits two parallel supporting lines, in O(h).
+    """
+    h = len(hull)
+    if h < 3:
+        return [(hull[0], hull[-1])] if hull else []
+    pairs = set()
+    for i, apex, _, _ in _calipers(hull):
+        # An edge parallel to edge i gives both of its ends
+        apexes = [apex]
+        if _height(hull, i, (apex + 1) % h) == _height(hull, i, apex):
+            apexes.append((apex + 1) % h)
+        for j in apexes:
+            for k in (i, (i + 1) % h):
+                pairs.add((min(j, k), max(j, k)))
+    return [(hull[j], hull[k]) for j, k in sorted(pairs)]
+
+
+def farthest_pairs(hull: List[Point]) -> List[Tuple[Point, Point]]:
+    """Returns every pair of hull vertices that are a diameter apart, in O(h)."""
+    pairs = antipodal_pairs(hull)
+    if not pairs:
+        raise ValueError('farthest pairs of an empty hull')
+    longest = max(_squared_distance(p, q) for p, q in pairs)
+    return [(p, q) for p, q in pairs if _squared_distance(p, q) == longest]
+
+
+def diameter(hull: List[Point]) -> Tuple[float, Tuple[Point, Point]]:
+    """
+    Returns the diameter of a clockwise hull (the largest distance between
+    two of its points) and a pair of vertices that far apart, in O(h).
+    """
+    p, q = farthest_pairs(hull)[0]
+    return sqrt(_squared_distance(p, q)), (p, q)
+
+
+def width(hull: List[Point]) -> Tuple[float, Tuple[Point, Point], Point]:
+    """
+    Returns the width of a clockwise hull (the smallest distance between two
+    parallel supporting lines), the hull edge on one of those lines and the
+    vertex on the other, in O(h).
+    """
+    h = len(hull)
+    if not hull:
+        raise ValueError('width of an empty hull')
+    if h < 3:
+        return 0.0, (hull[0], hull[-1]), hull[0]
+    best = None
+    for i, apex, _, _ in _calipers(hull):
+        edge = (hull[i], hull[(i + 1) % h])
+        distance = _height(hull, i, apex) / sqrt(_squared_distance(*edge))
+        if best is None or distance < best[0]:
+            best = (distance, edge, hull[apex])
+    return best
+
+
+def min_area_rectangle(hull: List[Point]) -> Tuple[float, Rectangle]:
+    """
+    Returns the area and the corners (in clockwise order) of the smallest
+    rectangle enclosing a clockwise hull, in O(h). One side of that rectangle
+    always lies along a hull edge.
+    """
+    h = len(hull)
+    if not hull:
+        raise ValueError('bounding rectangle of an empty hull')
+    if h < 3:
+        p, q = tuple(map(float, hull[0])), tuple(map(float, hull[-1]))
+        return 0.0, [p, q, q, p]
+    best = None
+    for i, apex, front, back in _calipers(hull):
+        (ax, ay), (bx, by) = hull[i], hull[(i + 1) % h]
+        ex, ey = bx - ax, by - ay
+        length2 = ex * ex + ey * ey
+        span = _projection(hull, i, front) - _projection(hull, i, back)
+        height = _height(hull, i, apex)
+        area = span * height / length2
+        if best is None or area < best[0]:
+            best = (area, i, front, back, height)
+
+    area, i, front, back, height = best
+    (ax, ay), (bx, by) = hull[i], hull[(i + 1) % h]
+    ex, ey = bx - ax, by - ay
+    length2 = ex * ex + ey * ey
+    offset = _projection(hull, i, i)
+    corners = []
+    # The interior lies to the left of every edge of a clockwise hull
+    for t, s in ((back, 0), (front, 0), (front, height), (back, height)):
+        along = (_projection(hull, i, t) - offset) / length2
+        across = s / length2
+        corners.append((ax + ex * along - ey * across, ay + ey * along + ex * across))
+    return area, corners
+
+
+def _edge_extremes(
+    offsets: np.ndarray, xy: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    For every edge of every hull in a ragged array, returns the index of its
+    end vertex, and of the vertices furthest from it, furthest forwards along
+    it and furthest backwards along it.
+
+    The edge directions of a clockwise hull turn steadily through one full
+    turn, so each of those vertices is where the edge angle first reaches the
+    edge's own angle plus pi, pi / 2 or 3 pi / 2 respectively: one binary
+    search over the edges' unwrapped angles for all edges at once.
+    """
+    counts = np.diff(offsets)
+    sets = np.flatnonzero(counts)
+    starts, counts = offsets[sets], counts[sets]
+    segments = np.repeat(np.arange(len(sets)), counts)
+    indices = np.arange(len(xy))
+    following = indices + 1
+    following[starts + counts - 1] = starts
+
+    edges = xy[following] - xy
+    raw = np.arctan2(edges[:, 1], edges[:, 0])
+    turns = np.zeros(len(xy))
+    turns[1:] = np.mod(np.diff(raw), 2 * np.pi)
+    turns[starts] = 0
+    angles = np.cumsum(turns)
+    # Restart every hull's angles from its first edge, 8 pi after the last
+    # hull's, so that a single sorted array holds them all
+    base = raw[starts] + 8 * np.pi * np.arange(len(sets)) - angles[starts]
+    angles += np.repeat(base, counts)
+
+    # Every hull's angles followed by a second lap, for searches past 2 pi
+    laps = np.argsort(np.concatenate([segments, segments]), kind='stable')
+    lap_angles = np.concatenate([angles, angles + 2 * np.pi])[laps]
+    lap_indices = np.concatenate([indices, indices])[laps]
+
+    def extreme(shift: float) -> np.ndarray:
+        found = np.searchsorted(lap_angles, angles + shift)
+        found = np.minimum(found, len(lap_angles) - 1)
+        index = lap_indices[found]
+        # Rounding can only overshoot into the next hull at its very start
+        stray = segments[index] != segments
+        index[stray] = starts[segments[stray]]
+        return index
+
+    return following, extreme(np.pi), extreme(np.pi / 2), extreme(3 * np.pi / 2)
+
+
+def _ragged(offsets: np.ndarray, coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.asarray(offsets, dtype=np.intp)
+    coords = np.asarray(coords).reshape(-1, 2)
+    if coords.dtype.kind in 'iub':
+        coords = coords.astype(np.int64)
+    return offsets - offsets[0], coords[offsets[0] : offsets[-1]]
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+
+def batch_diameters(
+    offsets: np.ndarray, coords: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batch form of `diameter` for many clockwise hulls in the ragged layout of
+    `batch_hulls`: returns the diameters and an (n, 2, 2) array of farthest
+    pairs. Empty hulls get a diameter of 0.
+    """
+    offsets, xy = _ragged(offsets, coords)
+    following, apex, _, _ = _edge_extremes(offsets, xy)
+    start = ((xy[apex] - xy) ** 2).sum(axis=1)
+    end = ((xy[apex] - xy[following]) ** 2).sum(axis=1)
+    partner = np.where(end > start, following, np.arange(len(xy)))
+    lengths = np.maximum(start, end)
+
+    diameters = np.zeros(len(offsets) - 1)
+    pairs = np.zeros((len(offsets) - 1, 2, 2), dtype=xy.dtype)
+    sets = np.flatnonzero(np.diff(offsets))
+    if len(sets):
+        best = segment_argmax(lengths, offsets[sets])
+        diameters[sets] = np.sqrt(lengths[best])
+        pairs[sets, 0] = xy[partner[best]]
+        pairs[sets, 1] = xy[apex[best]]
+    return diameters, pairs
+
+
+def batch_widths(offsets: np.ndarray, coords: np.ndarray) -> np.ndarray:
+    """
+    Batch form of `width` for many clockwise hulls in the ragged layout of
+    `batch_hulls`. Hulls with fewer than three vertices have width 0.
+    """
+    offsets, xy = _ragged(offsets, coords)
+    following, apex, _, _ = _edge_extremes(offsets, xy)
+    edges = xy[following] - xy
+    lengths = np.sqrt((edges ** 2).sum(axis=1))
+    heights = _cross(edges, xy[apex] - xy) / np.where(lengths > 0, lengths, 1)
+
+    widths = np.zeros(len(offsets) - 1)
+    sets = np.flatnonzero(np.diff(offsets))
+    if len(sets):
+        widths[sets] = np.minimum.reduceat(heights, offsets[sets])
+    return widths
+
+
+def batch_min_area_rectangles(
+    offsets: np.ndarray, coords: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batch form of `min_area_rectangle` for many clockwise hulls in the ragged
+    layout of `batch_hulls`: returns the areas and an (n, 4, 2) array of
+    rectangle corners.
+    """
+    offsets, xy = _ragged(offsets, coords)
+    following, apex, front, back = _edge_extremes(offsets, xy)
+    edges = xy[following] - xy
+    length2 = (edges ** 2).sum(axis=1)
+    heights = _cross(edges, xy[apex] - xy)
+    spans = (edges * (xy[front] - xy[back])).sum(axis=1)
+    areas = heights * (spans / np.where(length2 > 0, length2, 1))
+
+    result = np.zeros(len(offsets) - 1)
+    corners = np.zeros((len(offsets) - 1, 4, 2))
+    sets = np.flatnonzero(np.diff(offsets))
+    if not len(sets):
+        return result, corners
+    best = segment_argmax(-areas, offsets[sets])
+    result[sets] = areas[best]
+
+    # Corners as in `min_area_rectangle`: offsets along the best edge, then
+    # across it into the interior
+    edge = edges[best].astype(np.float64)
+    normal = np.stack([-edge[:, 1], edge[:, 0]], axis=1)
+    scale = np.where(length2[best] > 0, length2[best], 1)[:, None]
+    origin = xy[best]
+    height = heights[best][:, None] / scale
+    for corner, (ends, rise) in enumerate(((back, 0), (front, 0), (front, 1), (back, 1))):
+        along = (edge * (xy[ends[best]] - origin)).sum(axis=1)[:, None] / scale
+        corners[sets, corner] = origin + edge * along + normal * height * rise
+    return result, corners
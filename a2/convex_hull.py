@@ -1,13 +1,24 @@
-import math
 import sys
+from bisect import bisect_right
+from fractions import Fraction
+from itertools import chain
+from operator import itemgetter
+from operator import truediv
+from typing import Callable
 from typing import List
 from typing import Tuple
-from itertools import cycle
 from statistics import median
 
+import numpy as np
+
 EPSILON = sys.float_info.epsilon
 Point = Tuple[int, int]
 
+# Below this bound on |dx| + |dy|, distinct integer directions have distinct
+# float pseudo-angles (see `pseudo_angle`), since their exact values differ by
+# more than two units in the last place. Beyond it, ties are re-sorted exactly
+FLOAT_ANGLE_LIMIT = 2**25
+
 
 def y_intercept(p1: Point, p2: Point, x: int) -> float:
     """
@@ -62,6 +73,61 @@ def collinear(a: Point, b: Point, c: Point) -> bool:
     return abs(triangle_area(a, b, c)) <= EPSILON
 
 
+def pseudo_angle(dx: int, dy: int, divide: Callable = truediv) -> float:
+    """
+    Trig-free stand-in for the angle of (dx, dy) counter-clockwise from +x
+    (with the y-axis pointing up): maps [0, 2 pi) monotonically onto [0, 4).
+
+    Within each half-plane, dx / (|dx| + |dy|) is monotonic in the angle.
+    Pass `divide=Fraction` for an exact result.
+    """
+    if dy > 0 or (dy == 0 and dx >= 0):
+        # The zero vector counts as angle 0, like atan2(0, 0)
+        return 1 - divide(dx, abs(dx) + dy) if dx or dy else 0
+    return 3 + divide(dx, abs(dx) - dy)
+
+
+def _pseudo_angles(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `pseudo_angle`, with the same float arithmetic so that ties
+    match exactly. Offsets must stay below 2^53 in magnitude, so that they
+    convert to floats exactly.
+    """
+    upper = (dy > 0) | ((dy == 0) & (dx >= 0))
+    spread = np.abs(dx) + np.abs(dy)
+    ratio = dx / np.where(spread == 0, 1, spread)
+    angles = np.where(upper, 1 - ratio, 3 + ratio)
+    angles[spread == 0] = 0
+    return angles
+
+
+def _sort_runs_exactly(
+    points: List[Point], angles: np.ndarray, n: int, sum_x: int, sum_y: int
+):
+    """
+    Given `points` sorted by float pseudo-angles `angles`, re-sorts every run
+    of equal float angles by exact angle, then x, then y. Float division
+    rounds monotonically, so those runs are all that can be out of order.
+    """
+
+    def exact_key(point: Point):
+        dx, dy = n * point[0] - sum_x, n * point[1] - sum_y
+        return (pseudo_angle(dx, dy, Fraction), point[0], point[1])
+
+    # Runs start where the angle changes and end where it changes next
+    tied = angles[1:] == angles[:-1]
+    starts = np.flatnonzero(tied & ~np.concatenate([[False], tied[:-1]]))
+    ends = np.flatnonzero(tied & ~np.concatenate([tied[1:], [False]])) + 2
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        # Most ties are genuinely collinear with the centroid
+        ax, ay = n * points[start][0] - sum_x, n * points[start][1] - sum_y
+        if any(
+            ax * (n * p[1] - sum_y) != ay * (n * p[0] - sum_x)
+            for p in points[start + 1 : end]
+        ):
+            points[start:end] = sorted(points[start:end], key=exact_key)
+
+
 def sort_clockwise(points: List[Point]):
     """
     Sorts `points` by ascending clockwise angle from +x about the centroid,
@@ -75,19 +141,89 @@ def sort_clockwise(points: List[Point]):
     if len(points) < 2:
         return
 
-    # Compute the centroid
-    centroid_x = sum(p[0] for p in points) / len(points)
-    centroid_y = sum(p[1] for p in points) / len(points)
+    # Offsets from the centroid are scaled by n, so integer points stay exact
+    n = len(points)
+    sum_x = sum(map(itemgetter(0), points))
+    sum_y = sum(map(itemgetter(1), points))
+    far = False
+    angles = []
 
-    # Sort by ascending clockwise angle from +x, breaking ties with ^x then ^y
+    # Sort by ascending clockwise angle from +x, breaking ties with ^x then ^y.
+    # This is `pseudo_angle` inlined, as the key is the hot path
     def sort_key(point: Point):
-        angle = math.atan2(point[1] - centroid_y, point[0] - centroid_x)
-        normalized_angle = (angle + math.tau) % math.tau
-        return (normalized_angle, point[0], point[1])
+        nonlocal far
+        x, y = point
+        dx, dy = n * x - sum_x, n * y - sum_y
+        if dy > 0 or (dy == 0 and dx >= 0):
+            spread = dx + dy if dx >= 0 else dy - dx
+            angle = 1 - dx / spread if spread else 0
+        else:
+            spread = dx - dy if dx >= 0 else -dx - dy
+            angle = 3 + dx / spread
+        # Only offsets of 2^25 and more can round distinct angles to equal
+        # floats. Past the first one, angles are kept to look for ties
+        if far:
+            angles.append(angle)
+        elif spread >= FLOAT_ANGLE_LIMIT:
+            far = True
+            angles.append(angle)
+        return (angle, x, y)
 
-    # Sort the points
     points.sort(key=sort_key)
 
+    # Without any equal floats among all the angles there is nothing to fix
+    if not far or (len(angles) == n and len(set(angles)) == n):
+        return
+    if isinstance(sum_x, int) and isinstance(sum_y, int):
+        _sort_runs_exactly(
+            points, _sorted_angles(points, n, sum_x, sum_y), n, sum_x, sum_y
+        )
+
+
+def _sorted_angles(points: List[Point], n: int, sum_x: int, sum_y: int) -> np.ndarray:
+    """
+    The float pseudo-angles of integer `points` about their centroid, as
+    `sort_clockwise` computes them, in one vectorized pass where possible.
+    """
+    try:
+        coords = np.fromiter(chain.from_iterable(points), np.int64, 2 * n)
+        largest = max(int(coords.max()), -int(coords.min()))
+    except OverflowError:
+        largest = 2**63
+    # The vectorized angles need |dx| + |dy| < 2^53 to match exactly
+    if n * largest + max(abs(sum_x), abs(sum_y)) < 2**52:
+        x, y = coords[0::2], coords[1::2]
+        return _pseudo_angles(n * x - sum_x, n * y - sum_y)
+    return np.array([pseudo_angle(n * x - sum_x, n * y - sum_y) for x, y in points])
+
+
+def clockwise_order(coords: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `sort_clockwise`: given an (n, 2) array of points, returns the
+    permutation that sorts them in exactly the same order.
+
+    Integer coordinates are handled in int64, so they should stay below 2^30
+    in magnitude.
+    """
+    coords = np.asarray(coords)
+    n = len(coords)
+    if n < 2:
+        return np.arange(n)
+    if coords.dtype.kind in "iub":
+        coords = coords.astype(np.int64)
+    x, y = coords[:, 0], coords[:, 1]
+    sum_x, sum_y = x.sum(), y.sum()
+    dx, dy = n * x - sum_x, n * y - sum_y
+    angles = _pseudo_angles(dx, dy)
+    order = np.lexsort((np.arange(n), y, x, angles))
+
+    spread = np.abs(dx) + np.abs(dy)
+    if coords.dtype.kind == "i" and spread.max() >= FLOAT_ANGLE_LIMIT:
+        points = [(int(x[i]), int(y[i]), int(i)) for i in order]
+        _sort_runs_exactly(points, angles[order], n, int(sum_x), int(sum_y))
+        order = np.array([i for _, _, i in points], dtype=np.intp)
+    return order
+
 
 def base_case_hull(points: List[Point]) -> List[Point]:
     """Base case of the recursive algorithm."""
@@ -197,137 +333,235 @@ def compute_hull(points: List[Point]) -> List[Point]:
     and returns only the points that are on the hull *in clockwise order*.
     """
 
-    # sort points by x value
-    points = sorted(points, key=lambda point: point[0])
+    # sort distinct points by x value, then by y value, so that the hulls of
+    # the two halves can be merged along their common tangents
+    points = sorted(set(points))
     return divide_and_conquer_hull(points)
 
 
-def find_upper_tangent(
-    left_hull: List[Point], right_hull: List[Point]
-) -> Tuple[Point, Point]:
-    """Find the upper tangent between two hulls."""
-    # Rightmost point of left hull
-    l_point = max(left_hull, key=lambda point: point[0])
-
-    # Leftmost point of right hull
-    r_point = min(right_hull, key=lambda point: point[0])
+def monotone_chains(points: List[Point]) -> Tuple[List[Point], List[Point]]:
+    """
+    Given distinct points sorted by ascending x and then ascending y,
+    returns the lower and upper chains of their hull, both in that order.
+    Collinear points are dropped from the chains.
+    """
+    lower: List[Point] = []
+    upper: List[Point] = []
+    for point in points:
+        while len(lower) >= 2 and not is_clockwise(lower[-2], lower[-1], point):
+            lower.pop()
+        lower.append(point)
+        while len(upper) >= 2 and not is_counter_clockwise(
+            upper[-2], upper[-1], point
+        ):
+            upper.pop()
+        upper.append(point)
+    return lower, upper
+
+
+def join_chains(lower: List[Point], upper: List[Point]) -> List[Point]:
+    """Joins a lower and an upper chain into a single hull in clockwise order."""
+    if len(lower) <= 1:
+        return list(lower)
+    return lower + upper[-2:0:-1]
+
+
+def improves(origin: Point, best: Point, candidate: Point, upper: bool) -> bool:
+    """
+    Gift-wrapping step: returns True if and only if `candidate` is a better
+    next chain vertex after `origin` than `best`, i.e. if it lies strictly
+    outside the line origin->best or on that line but further along it.
+    """
+    area = triangle_area(origin, best, candidate)
+    if abs(area) <= EPSILON:
+        return candidate > best
+    return (area < 0) == upper
 
-    x_separator = (l_point[0] + r_point[0]) / 2
-    # x_separator = median(point[0] for point in left_hull + right_hull)
 
-    # Cycles for circular iteration
-    l_cycle = cycle(left_hull[::-1])  # Reverse for counterclockwise iteration
-    r_cycle = cycle(right_hull)
+def chain_tangent(chain: List[Point], origin: Point, upper: bool) -> Point:
+    """
+    Given a lower or upper chain and a point `origin` on or outside it,
+    returns the next vertex after `origin` that a gift-wrapping walk along the
+    chain would reach. `chain` must contain at least one point after `origin`.
 
-    # Advance L and R iterators to rightmost and leftmost points, respectively
-    while next(l_cycle) != l_point:
-        pass
-    while next(r_cycle) != r_point:
-        pass
+    The vertices following `origin` improve on their predecessor up to the
+    tangent point and never afterwards, so this is a binary search: O(log h).
+    """
+    low = bisect_right(chain, origin)
+    high = len(chain) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if improves(origin, chain[middle], chain[middle + 1], upper):
+            low = middle + 1
+        else:
+            high = middle
+    return chain[low]
+
+
+def wrap_chain(
+    chains: List[List[Point]], start: Point, end: Point, upper: bool, limit: int
+) -> List[Point]:
+    """
+    Gift-wraps a lower or upper hull chain from `start` to `end` over the
+    points of several smaller chains, taking at most `limit` steps.
+    Returns None if the chain has more than `limit` edges.
+    """
+    chain = [start]
+    point = start
+    while point != end:
+        if len(chain) > limit:
+            return None
+        best = None
+        for group in chains:
+            # Groups entirely behind the current point have nothing to offer
+            if group[-1] <= point:
+                continue
+            candidate = chain_tangent(group, point, upper)
+            if best is None or improves(point, best, candidate, upper):
+                best = candidate
+        point = best
+        chain.append(point)
+    return chain
 
-    previous_l = None
-    previous_r = None
 
-    highest_y_intercept = 0
+def chan_hull(points: List[Point]) -> List[Point]:
+    """
+    Output-sensitive alternative to `compute_hull` (Chan's algorithm):
+    computes the convex hull of `points` in O(n log h) time, where h is the
+    number of hull vertices, and returns the hull vertices in clockwise order.
+
+    For guesses m = 2^8, 2^16, ... the points are split into groups of m
+    whose chains are computed by sorting, and the lower and upper hulls are
+    gift-wrapped over those chains, giving up after m steps. (Chan starts at
+    m = 2^2, but each failed guess costs a full pass over the points, and
+    wrapping a few dozen vertices over groups of 2^8 is already cheap.)
+    """
+    points = list(set(points))
+    if not points:
+        return []
+    start, end = min(points), max(points)
 
+    exponent = 3
     while True:
-        previous_l = l_point
-        previous_r = r_point
-
-        # Walk counterclockwise on left hull until tangent height no longer improves
-        next_l = next(l_cycle)
-        while y_intercept(next_l, r_point, x_separator) > highest_y_intercept:
-            l_point = next_l
-            highest_y_intercept = y_intercept(l_point, r_point, x_separator)
-
-        # Walk clockwise on right hull until tangent height no longer improves
-        next_r = next(r_cycle)
-        while y_intercept(l_point, next_r, x_separator) > highest_y_intercept:
-            r_point = next_r
-            highest_y_intercept = y_intercept(l_point, r_point, x_separator)
-
-        # Return if neither the next L or R point will result in a better height
-        if l_point == previous_l and r_point == previous_r:
-            return (l_point, r_point)
+        group_size = min(2 ** (2**exponent), len(points))
+        groups = [
+            monotone_chains(sorted(points[i : i + group_size]))
+            for i in range(0, len(points), group_size)
+        ]
+        lower = wrap_chain([g[0] for g in groups], start, end, False, group_size)
+        if lower is not None:
+            upper = wrap_chain([g[1] for g in groups], start, end, True, group_size)
+            if upper is not None:
+                return join_chains(lower, upper)
+        # Points inside their group's hull cannot be on the overall hull
+        points = [point for g in groups for point in g[0] + g[1][1:-1]]
+        exponent += 1
+
+
+class HullChain:
+    """
+    Read-only view of the lower or upper chain of a hull in clockwise order,
+    indexed in ascending (x, y) order like the chains of `monotone_chains`.
+    Nothing is copied: item k maps straight to an index into the hull.
+    """
 
+    def __init__(self, hull: List[Point], upper: bool):
+        indices = range(len(hull))
+        self.hull = hull
+        self.start = min(indices, key=hull.__getitem__)
+        end = max(indices, key=hull.__getitem__)
+        # The lower chain runs forwards from the leftmost vertex, the upper
+        # chain backwards
+        self.step = -1 if upper else 1
+        self.length = (end - self.start) * self.step % len(hull) + 1
 
-def find_lower_tangent(
-    left_hull: List[Point], right_hull: List[Point]
-) -> Tuple[Point, Point]:
-    """Find the lower tangent between two hulls."""
-    # Rightmost point of left hull
-    l_point = max(left_hull, key=lambda point: point[0])
+    def __len__(self) -> int:
+        return self.length
 
-    # Leftmost point of right hull
-    r_point = min(right_hull, key=lambda point: point[0])
+    def index(self, k: int) -> int:
+        """Index into the hull of item k of the chain."""
+        return (self.start + self.step * k) % len(self.hull)
 
-    x_separator = (l_point[0] + r_point[0]) / 2
+    def __getitem__(self, k: int) -> Point:
+        if not 0 <= k < self.length:
+            raise IndexError(k)
+        return self.hull[self.index(k)]
 
-    # Cycles for circular iteration
-    l_cycle = cycle(left_hull)
-    r_cycle = cycle(right_hull[::-1])  # Reverse for counterclockwise iteration
 
-    # Advance L and R iterators to rightmost and leftmost points, respectively
-    while next(l_cycle) != l_point:
-        pass
-    while next(r_cycle) != r_point:
-        pass
+def bridge(
+    left_hull: List[Point], right_hull: List[Point], upper: bool
+) -> Tuple[int, int]:
+    """
+    Given two hulls in clockwise order whose vertices all compare less on
+    the left than on the right (e.g. the hulls of the two halves of a sorted
+    list of distinct points), returns the indices into each of the ends of
+    their upper or lower common tangent. Vertices collinear with the tangent
+    are skipped, so its ends are as far apart as possible.
+
+    For a left vertex p, `chain_tangent` finds the tangent from p to the
+    right chain by binary search. The next left vertex lies outside that
+    tangent exactly while p is still left of the bridge, so a second binary
+    search over the left chain finds it: O(log^2 h) in all, plus the O(h)
+    scan for the ends of each chain.
+    """
+    left = HullChain(left_hull, upper)
+    right = HullChain(right_hull, upper)
+    low, high = 0, len(left) - 1
+    while low < high:
+        middle = (low + high) // 2
+        origin = left[middle]
+        vertex = chain_tangent(right, origin, upper)
+        if improves(origin, vertex, left[middle + 1], upper):
+            low = middle + 1
+        else:
+            high = middle
+    vertex = chain_tangent(right, left[low], upper)
+    return left.index(low), right.index(bisect_right(right, vertex) - 1)
+
+
+def tangent(
+    left_hull: List[Point], right_hull: List[Point], upper: bool = True
+) -> Tuple[Point, Point]:
+    """
+    Returns the (left, right) ends of the upper or lower common tangent of
+    two hulls separated as for `bridge`.
+    """
+    i, j = bridge(left_hull, right_hull, upper)
+    return left_hull[i], right_hull[j]
 
-    previous_l = None
-    previous_r = None
 
-    lowest_y_intercept = 0
+def find_upper_tangent(
+    left_hull: List[Point], right_hull: List[Point]
+) -> Tuple[Point, Point]:
+    """Find the upper tangent between two hulls."""
+    return tangent(left_hull, right_hull, upper=True)
 
-    while True:
-        previous_l = l_point
-        previous_r = r_point
 
-        # Walk counterclockwise on left hull until tangent height no longer improves
-        next_l = next(l_cycle)
-        while y_intercept(next_l, r_point, x_separator) < lowest_y_intercept:
-            l_point = next_l
-            lowest_y_intercept = y_intercept(l_point, r_point, x_separator)
+def find_lower_tangent(
+    left_hull: List[Point], right_hull: List[Point]
+) -> Tuple[Point, Point]:
+    """Find the lower tangent between two hulls."""
+    return tangent(left_hull, right_hull, upper=False)
 
-        # Walk clockwise on right hull until tangent height no longer improves
-        next_r = next(r_cycle)
-        while y_intercept(l_point, next_r, x_separator) < lowest_y_intercept:
-            r_point = next_r
-            lowest_y_intercept = y_intercept(l_point, r_point, x_separator)
 
-        # Return if neither the next L or R point will result in a better height
-        if l_point == previous_l and r_point == previous_r:
-            return (l_point, r_point)
+def walk(hull: List[Point], start: int, end: int) -> List[Point]:
+    """Returns the vertices of a hull from index start to index end, inclusive."""
+    if end < start:
+        return hull[start:] + hull[: end + 1]
+    return hull[start : end + 1]
 
 
 def merge(left_hull: List[Point], right_hull: List[Point]) -> List[Point]:
     """Merge two hulls, dropping any interior points.
     Returns the new hull in clockwise order."""
-    hull = left_hull + right_hull
-
-    upper_tangent = find_upper_tangent(left_hull, right_hull)
-    lower_tangent = find_lower_tangent(left_hull, right_hull)
-
-    l_cycle = cycle(left_hull)
-    r_cycle = cycle(right_hull[::-1])
-
-    # Advance L and R iterators to points on upper tangent
-    while next(l_cycle) != upper_tangent[0]:
-        pass
-    while next(r_cycle) != upper_tangent[1]:
-        pass
-
-    l_point = next(l_cycle)
-    r_point = next(r_cycle)
-
-    while l_point != lower_tangent[0]:
-        hull.remove(l_point)
-        l_point = next(l_cycle)
-    while r_point != lower_tangent[1]:
-        hull.remove(r_point)
-        r_point = next(r_cycle)
-
-    sort_clockwise(hull)
-    return hull
+    upper_left, upper_right = bridge(left_hull, right_hull, upper=True)
+    lower_left, lower_right = bridge(left_hull, right_hull, upper=False)
+
+    # Clockwise: down the left hull from the upper tangent to the lower one,
+    # across, and up the right hull back to the upper tangent
+    return walk(left_hull, upper_left, lower_left) + walk(
+        right_hull, lower_right, upper_right
+    )
 
 
 def find_dividing_line(left_hull: List[Point], right_hull: List[Point]) -> int:
@@ -0,0 +1,128 @@
+from math import sqrt
+from typing import List
+from typing import Tuple
+
+import numpy as np
+
+from batch_hull import discard_interior
+from batch_hull import peel_chain
+from convex_hull import Point
+
+# Below this many remaining points, every layer is peeled from all of them
+MIN_CORE_SIZE = 1 << 12
+
+# Points kept outside the core, in units of sqrt(remaining * layer size)
+CORE_MARGIN = 4
+
+
+def _hull_chains(xy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Given distinct points sorted by (x, y), returns the indices of their
+    lower and upper hull chains, both sorted by (x, y).
+    """
+    segments = np.zeros(len(xy), dtype=np.intp)
+    candidates = np.flatnonzero(discard_interior(xy[:, 0], xy[:, 1], segments))
+    chain_points, segments = xy[candidates], segments[: len(candidates)]
+    lower = candidates[peel_chain(chain_points, segments, 1)]
+    upper = candidates[peel_chain(chain_points, segments, -1)]
+    return lower, upper
+
+
+def _core_mask(xy: np.ndarray, polygon: np.ndarray, outside: int) -> np.ndarray:
+    """
+    Returns a mask of the points that are deepest inside `polygon` (a convex
+    polygon in either orientation), leaving about `outside` points unmasked.
+    Depth is measured by the polygon's gauge: how far the polygon must be
+    scaled about its centroid to reach a point.
+    """
+    # A few of its vertices describe the polygon's shape well enough
+    polygon = polygon[:: max(1, len(polygon) // 16)].astype(np.float64)
+    centre = polygon.mean(axis=0)
+    offsets = xy - centre
+    gauge = np.full(len(xy), -np.inf)
+    for a, b in zip(polygon, np.roll(polygon, -1, axis=0)):
+        normal = np.array([b[1] - a[1], a[0] - b[0]])
+        reach = normal @ (a - centre)
+        if reach == 0:
+            return np.zeros(len(xy), dtype=bool)
+        np.maximum(gauge, offsets @ (normal / reach), out=gauge)
+    threshold = np.partition(gauge, len(xy) - outside)[len(xy) - outside]
+    return gauge < threshold
+
+
+def layer_array(coords: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `convex_layers`: takes an (n, 2) array of points and returns
+    the array of their layer indices.
+    """
+    coords = np.asarray(coords).reshape(-1, 2)
+    if coords.dtype.kind in 'iub':
+        coords = coords.astype(np.int64)
+    if not len(coords):
+        return np.empty(0, dtype=np.intp)
+
+    # Sort once: every layer is then found on the already-sorted survivors
+    points, inverse = np.unique(coords, axis=0, return_inverse=True)
+    layers = np.empty(len(points), dtype=np.intp)
+
+    # Layers are peeled from the active points only. The others lie inside
+    # or on the hull of the core points, so none of them can be a hull vertex
+    # until a core point has been peeled
+    active = np.arange(len(points))
+    inactive = np.empty(0, dtype=np.intp)
+    core = np.empty(0, dtype=np.intp)
+    is_core = np.zeros(len(points), dtype=bool)
+
+    layer = 0
+    while len(active):
+        xy = points[active]
+        lower, upper = _hull_chains(xy)
+        on_hull = np.zeros(len(active), dtype=bool)
+        on_hull[lower] = on_hull[upper] = True
+        hull = active[on_hull]
+        layers[hull] = layer
+        layer += 1
+        active = active[~on_hull]
+
+        if len(inactive) and is_core[hull].any():
+            is_core[core] = False
+            active = np.sort(np.concatenate([active, inactive]))
+            inactive = np.empty(0, dtype=np.intp)
+
+        remaining = len(active)
+        outside = int(CORE_MARGIN * sqrt(remaining * len(hull)))
+        if not len(inactive) and remaining > max(MIN_CORE_SIZE, 2 * outside):
+            polygon = xy[np.concatenate([lower, upper[::-1]])]
+            deep = _core_mask(points[active], polygon, outside)
+            if len(np.flatnonzero(deep)) < 3:
+                continue
+            deep_ids = active[deep]
+            core_lower, core_upper = _hull_chains(points[deep_ids])
+            core = deep_ids[np.union1d(core_lower, core_upper)]
+            is_core[core] = True
+            sleeping = deep.copy()
+            sleeping[np.flatnonzero(deep)[np.union1d(core_lower, core_upper)]] = False
+            inactive = active[sleeping]
+            active = active[~sleeping]
+
+    return layers[inverse.reshape(-1)]
+
+
+def convex_layers(points: List[Point]) -> List[int]:
+    """
+    Onion peeling: returns, for every point, the index of its convex layer.
+
+    Layer 0 consists of the vertices of the convex hull of all the points,
+    layer 1 of the vertices of the hull of the rest, and so on, exactly as if
+    the hull were computed and removed repeatedly. Points on a hull edge but
+    not at a vertex belong to a later layer, and repeated points share a
+    layer.
+
+    The points are sorted once, and each layer is peeled from the sorted
+    survivors with whole-array NumPy operations (see `batch_hull`). Deep
+    points are set aside inside the hull of a core of other points, so a
+    layer only touches the points near the boundary instead of all of them.
+    """
+    if not len(points):
+        return []
+    return layer_array(np.array(points)).tolist()
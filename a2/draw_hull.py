@@ -1,11 +1,10 @@
-import copy
 from tkinter import Button
 from tkinter import Canvas
 from tkinter import NORMAL
 from tkinter import PhotoImage
 from tkinter import Tk
 
-from convex_hull import compute_hull
+from incremental_hull import IncrementalHull
 
 
 def draw_point(canvas, x, y):
@@ -14,12 +13,12 @@ def draw_point(canvas, x, y):
 
 def add_point(event):
     draw_point(w, event.x, event.y)
-    points.append((event.x, event.y))
+    points.insert((event.x, event.y))
     return
 
 
 def draw_hull():
-    hull = copy.copy(compute_hull(points))
+    hull = points.hull()
     hull.append(hull[0])
     for i in range(0, len(hull) - 1):
         x1 = hull[i][0]
@@ -31,7 +30,7 @@ def draw_hull():
 
 
 if __name__ == '__main__':
-    master, points = Tk(), list()
+    master, points = Tk(), IncrementalHull()
 
     submit_button = Button(master, text="Draw Hull", command=draw_hull)
     submit_button.pack()
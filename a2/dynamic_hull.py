@@ -0,0 +1,418 @@
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from convex_hull import Point
+from convex_hull import triangle_area
+
+Bridge = Tuple[Point, Point]
+
+# Chain indices into `_Node.bridges`, and the sign that makes `triangle_area`
+# positive for a strictly convex (x-ordered) triple on that chain
+UPPER = 0
+LOWER = 1
+_SIGNS = (1, -1)
+
+
+class _Node:
+    """
+    Node of a leaf-oriented AVL tree over the distinct points, ordered by
+    ascending x and then ascending y.
+
+    Leaves hold a single point. Internal nodes always have two children and
+    store, for both the upper and the lower chain, the bridge joining the
+    hull of the left subtree to the hull of the right subtree. The chain of
+    a subtree is therefore its left child's chain up to the bridge followed by
+    its right child's chain from the bridge onwards, which lets every query
+    walk the chain implicitly without storing it (Overmars & van Leeuwen).
+    """
+
+    __slots__ = ("left", "right", "point", "low", "high", "height", "bridges")
+
+    def __init__(self, point: Optional[Point] = None):
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        self.point = point
+        self.low = point
+        self.high = point
+        self.height = 0
+        self.bridges: Tuple[Bridge, Bridge] = None
+
+
+def _crosses_right_of(
+    a: Point, b: Point, c: Point, d: Point, h: Point, sign: int
+) -> bool:
+    """
+    Returns True if and only if the lines through a,b and c,d intersect
+    strictly to the right of h.
+
+    Points are ordered by x and then y, which is the x-order of a shear
+    x' = x + εy for an infinitesimal ε. Shears preserve cross products, so
+    the comparison is carried out in that frame: exactly in x first, then in
+    the ε term to break ties on equal x.
+    """
+    cross_ab = (b[0] - a[0]) * (h[1] - a[1]) - (b[1] - a[1]) * (h[0] - a[0])
+    cross_cd = (d[0] - c[0]) * (h[1] - c[1]) - (d[1] - c[1]) * (h[0] - c[0])
+    difference = cross_ab * (d[0] - c[0]) - cross_cd * (b[0] - a[0])
+    if difference == 0:
+        difference = cross_ab * (d[1] - c[1]) - cross_cd * (b[1] - a[1])
+    return sign * difference > 0
+
+
+def _find_bridge(left: _Node, right: _Node, chain: int) -> Bridge:
+    """
+    Finds the bridge on `chain` between the hulls of two subtrees, where every
+    point of `left` precedes every point of `right`.
+
+    Each step discards half of the remaining chain of one subtree, replacing
+    that subtree with a child whose hull still contains the bridge endpoint,
+    so this takes O(log n) steps. Among collinear candidates the bridge runs
+    from the leftmost to the rightmost point.
+    """
+    sign = _SIGNS[chain]
+    high = left.high
+    x, y = left, right
+
+    while x.left is not None or y.left is not None:
+        if x.left is None:
+            # Only the tangent from x's point onto y remains to be found
+            c, d = y.bridges[chain]
+            y = y.right if sign * triangle_area(c, d, x.point) <= 0 else y.left
+        elif y.left is None:
+            # Only the tangent from y's point onto x remains to be found
+            a, b = x.bridges[chain]
+            x = x.left if sign * triangle_area(a, b, y.point) <= 0 else x.right
+        else:
+            a, b = x.bridges[chain]
+            c, d = y.bridges[chain]
+            if (
+                sign * triangle_area(a, b, c) <= 0
+                or sign * triangle_area(a, b, d) <= 0
+            ):
+                # Part of y lies above the edge a,b: the bridge leaves x at or
+                # before a
+                x = x.left
+            elif (
+                sign * triangle_area(c, d, a) <= 0
+                or sign * triangle_area(c, d, b) <= 0
+            ):
+                # Likewise, the bridge reaches y at or after d
+                y = y.right
+            elif _crosses_right_of(a, b, c, d, high, sign):
+                y = y.left
+            else:
+                x = x.right
+
+    return x.point, y.point
+
+
+def _update(node: _Node):
+    """Recomputes the cached fields of an internal node from its children."""
+    node.height = 1 + max(node.left.height, node.right.height)
+    node.low = node.left.low
+    node.high = node.right.high
+    node.bridges = (
+        _find_bridge(node.left, node.right, UPPER),
+        _find_bridge(node.left, node.right, LOWER),
+    )
+
+
+def _join(left: _Node, right: _Node) -> _Node:
+    node = _Node()
+    node.left = left
+    node.right = right
+    _update(node)
+    return node
+
+
+def _rotate_left(node: _Node) -> _Node:
+    pivot = node.right
+    node.right = pivot.left
+    _update(node)
+    pivot.left = node
+    _update(pivot)
+    return pivot
+
+
+def _rotate_right(node: _Node) -> _Node:
+    pivot = node.left
+    node.left = pivot.right
+    _update(node)
+    pivot.right = node
+    _update(pivot)
+    return pivot
+
+
+def _rebalance(node: _Node) -> _Node:
+    balance = node.left.height - node.right.height
+    if balance > 1:
+        if node.left.left.height < node.left.right.height:
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if node.right.right.height < node.right.left.height:
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    _update(node)
+    return node
+
+
+def _build(points: List[Point]) -> Optional[_Node]:
+    """Builds a balanced tree over distinct points sorted by (x, y)."""
+    if not points:
+        return None
+    if len(points) == 1:
+        return _Node(points[0])
+    middle = len(points) // 2
+    return _join(_build(points[:middle]), _build(points[middle:]))
+
+
+def _insert(node: _Node, point: Point) -> _Node:
+    if node.left is None:
+        leaf = _Node(point)
+        return _join(leaf, node) if point < node.point else _join(node, leaf)
+    if point <= node.left.high:
+        node.left = _insert(node.left, point)
+    else:
+        node.right = _insert(node.right, point)
+    return _rebalance(node)
+
+
+def _delete(node: _Node, point: Point) -> Optional[_Node]:
+    if node.left is None:
+        return None
+    if point <= node.left.high:
+        child = _delete(node.left, point)
+        if child is None:
+            return node.right
+        node.left = child
+    else:
+        child = _delete(node.right, point)
+        if child is None:
+            return node.left
+        node.right = child
+    return _rebalance(node)
+
+
+def _collect(
+    node: _Node,
+    chain: int,
+    low: Optional[Point],
+    high: Optional[Point],
+    out: List[Point],
+):
+    """Appends the vertices of `node`'s chain lying between low and high."""
+    if node.left is None:
+        out.append(node.point)
+        return
+    a, b = node.bridges[chain]
+    if low is None or low <= a:
+        _collect(node.left, chain, low, a if high is None or a < high else high, out)
+    if high is None or b <= high:
+        _collect(node.right, chain, b if low is None or b > low else low, high, out)
+
+
+def _locate(
+    node: _Node, point: Point, chain: int
+) -> Tuple[Optional[Point], Optional[Point]]:
+    """
+    Returns the last vertex of the chain that is <= point and the first one
+    that is >= point (None where no such vertex exists).
+    """
+    predecessor = successor = None
+    while node.left is not None:
+        a, b = node.bridges[chain]
+        if b <= point:
+            if predecessor is None or b >= predecessor:
+                predecessor = b
+            node = node.right
+        elif a >= point:
+            if successor is None or a <= successor:
+                successor = a
+            node = node.left
+        else:
+            return a, b
+    if node.point <= point:
+        predecessor = node.point
+    if node.point >= point:
+        successor = node.point
+    return predecessor, successor
+
+
+def _tangent_from_left(node: _Node, point: Point, chain: int) -> Point:
+    """Tangent point on `chain` seen from a point preceding the whole subtree."""
+    sign = _SIGNS[chain]
+    while node.left is not None:
+        c, d = node.bridges[chain]
+        node = node.right if sign * triangle_area(c, d, point) <= 0 else node.left
+    return node.point
+
+
+def _tangent_from_right(node: _Node, point: Point, chain: int) -> Point:
+    """Tangent point on `chain` seen from a point following the whole subtree."""
+    sign = _SIGNS[chain]
+    while node.left is not None:
+        a, b = node.bridges[chain]
+        node = node.left if sign * triangle_area(a, b, point) <= 0 else node.right
+    return node.point
+
+
+def _split_tangents(node: _Node, point: Point, chain: int) -> Bridge:
+    """
+    Tangent points on `chain` seen from a point outside that chain but within
+    the x-range of the subtree: one among the points before `point`, one among
+    the points after it. Each side is covered by O(log n) whole subtrees,
+    whose individual tangents are combined.
+    """
+    sign = _SIGNS[chain]
+    before: List[Point] = []
+    after: List[Point] = []
+    while node.left is not None:
+        if point <= node.left.high:
+            after.append(_tangent_from_left(node.right, point, chain))
+            node = node.left
+        else:
+            before.append(_tangent_from_right(node.left, point, chain))
+            node = node.right
+    (before if node.point < point else after).append(node.point)
+
+    left_tangent = before[0]
+    for candidate in before[1:]:
+        if sign * triangle_area(left_tangent, point, candidate) < 0:
+            left_tangent = candidate
+    right_tangent = after[0]
+    for candidate in after[1:]:
+        if sign * triangle_area(point, right_tangent, candidate) < 0:
+            right_tangent = candidate
+    return left_tangent, right_tangent
+
+
+class DynamicHull:
+    """
+    Fully dynamic convex hull of a multiset of points.
+
+    Points can be inserted and deleted in O(log^2 n) time, e.g. to maintain
+    the hull of a sliding window, and the structure answers:
+
+    - `hull()`, the clockwise hull, in O(h log n),
+    - `contains(point)`, `extreme(direction)` and `tangents_from(point)`
+      in O(log n), or O(log^2 n) for tangents from points above or below
+      the hull.
+    """
+
+    def __init__(self, points: Iterable[Point] = ()):
+        self._counts: Dict[Point, int] = {}
+        for point in points:
+            point = tuple(point)
+            self._counts[point] = self._counts.get(point, 0) + 1
+        self._size = sum(self._counts.values())
+        self._root = _build(sorted(self._counts))
+
+    def __len__(self) -> int:
+        """Number of points stored, counting repeated points."""
+        return self._size
+
+    def insert(self, point: Point):
+        """Adds `point`, which may already be present."""
+        point = tuple(point)
+        count = self._counts.get(point, 0)
+        self._counts[point] = count + 1
+        self._size += 1
+        if count:
+            return
+        if self._root is None:
+            self._root = _Node(point)
+        else:
+            self._root = _insert(self._root, point)
+
+    def delete(self, point: Point):
+        """Removes one copy of `point`. Raises KeyError if it is not present."""
+        point = tuple(point)
+        count = self._counts[point]
+        self._size -= 1
+        if count > 1:
+            self._counts[point] = count - 1
+            return
+        del self._counts[point]
+        self._root = _delete(self._root, point)
+
+    def hull(self) -> List[Point]:
+        """Returns the current hull in clockwise order."""
+        if self._root is None:
+            return []
+        lower: List[Point] = []
+        upper: List[Point] = []
+        _collect(self._root, LOWER, None, None, lower)
+        _collect(self._root, UPPER, None, None, upper)
+        if len(lower) == 1:
+            return lower
+        return lower + upper[-2:0:-1]
+
+    def contains(self, point: Point) -> bool:
+        """Returns True if and only if `point` lies inside or on the hull."""
+        if self._root is None:
+            return False
+        point = tuple(point)
+        for chain in (UPPER, LOWER):
+            predecessor, successor = _locate(self._root, point, chain)
+            if predecessor is None or successor is None:
+                return False
+            if predecessor == successor:
+                return True
+            if _SIGNS[chain] * triangle_area(predecessor, point, successor) > 0:
+                return False
+        return True
+
+    def extreme(self, direction: Tuple[float, float]) -> Point:
+        """Returns a hull vertex p maximizing the dot product of `direction` and p."""
+        if self._root is None:
+            raise ValueError("extreme point of an empty hull")
+        dx, dy = direction
+        if dy == 0:
+            if dx == 0:
+                raise ValueError("direction must be non-zero")
+            return self._root.high if dx > 0 else self._root.low
+
+        chain = UPPER if dy > 0 else LOWER
+        node = self._root
+        while node.left is not None:
+            a, b = node.bridges[chain]
+            if dx * b[0] + dy * b[1] > dx * a[0] + dy * a[1]:
+                node = node.right
+            else:
+                node = node.left
+        return node.point
+
+    def tangents_from(self, point: Point) -> Optional[Bridge]:
+        """
+        Returns the two hull vertices (u, v) touched by the tangent lines from
+        `point`, ordered so that `point`, u, v is not counter-clockwise.
+        Returns None if `point` lies inside or on the hull.
+        """
+        if self._root is None:
+            return None
+        point = tuple(point)
+        root = self._root
+
+        if point < root.low:
+            first = _tangent_from_left(root, point, UPPER)
+            second = _tangent_from_left(root, point, LOWER)
+        elif point > root.high:
+            first = _tangent_from_right(root, point, UPPER)
+            second = _tangent_from_right(root, point, LOWER)
+        else:
+            for chain in (UPPER, LOWER):
+                predecessor, successor = _locate(root, point, chain)
+                if predecessor == successor:
+                    return None
+                if _SIGNS[chain] * triangle_area(predecessor, point, successor) > 0:
+                    first, second = _split_tangents(root, point, chain)
+                    break
+            else:
+                return None
+
+        if triangle_area(point, first, second) > 0:
+            first, second = second, first
+        return first, second
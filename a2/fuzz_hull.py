@@ -0,0 +1,325 @@
+import argparse
+import os
+import sys
+from math import isqrt
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+
+from batch_hull import hull_array
+from benchmarks import DISTRIBUTIONS
+from chunked_hull import chunked_hull
+from convex_hull import Point
+from convex_hull import base_case_hull
+from convex_hull import chan_hull
+from convex_hull import compute_hull
+from dynamic_hull import DynamicHull
+from hull_index import build_hull
+from incremental_hull import IncrementalHull
+from point_io import save_points
+
+# Largest coordinate magnitude the NumPy engines handle exactly in int64
+MAX_COORD = (1 << 30) - 1
+
+# Hull engines, each taking the coordinate array and its list of points
+ENGINES: Dict[str, Callable[[np.ndarray, List[Point]], object]] = {
+    # The base case expects distinct points, as compute_hull hands it
+    'naive': lambda coords, points: base_case_hull(list(set(points))),
+    'dnc': lambda coords, points: compute_hull(points),
+    'chan': lambda coords, points: chan_hull(points),
+    'incremental': lambda coords, points: IncrementalHull(points).hull(),
+    'dynamic': lambda coords, points: DynamicHull(points).hull(),
+    'index': lambda coords, points: build_hull(points).vertices,
+    'numpy': lambda coords, points: hull_array(coords),
+    'chunked': lambda coords, points: chunked_hull(coords, chunk_size=1000),
+}
+
+# Engines that may keep points lying on a hull edge as vertices
+KEEPS_COLLINEAR = {'naive', 'dnc'}
+
+# The naive engine is O(n^3), so larger inputs are skipped
+MAX_SIZES = {'naive': 100}
+
+
+def collinear(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Points on one line with a random lattice direction."""
+    direction = rng.integers(-50, 50, size=2, endpoint=True)
+    if not direction.any():
+        direction[0] = 1
+    steps = rng.integers(-1000, 1000, size=(n, 1), endpoint=True)
+    return rng.integers(-1000, 1000, size=2, endpoint=True) + steps * direction
+
+
+def vertical(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Points sharing a single x coordinate."""
+    coords = rng.integers(-1000, 1000, size=(n, 2), endpoint=True)
+    coords[:, 0] = coords[0, 0]
+    return coords
+
+
+def duplicates(n: int, rng: np.random.Generator) -> np.ndarray:
+    """A handful of distinct points, each repeated many times."""
+    distinct = rng.integers(-1000, 1000, size=(rng.integers(1, 6, endpoint=True), 2))
+    return distinct[rng.integers(0, len(distinct), n)]
+
+
+def grid(n: int, rng: np.random.Generator) -> np.ndarray:
+    """A small grid: many repeated points and many points on hull edges."""
+    return rng.integers(0, 9, size=(n, 2), endpoint=True)
+
+
+def huge(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Uniform over the whole range of exactly handled coordinates."""
+    coords = rng.integers(-MAX_COORD, MAX_COORD, size=(n, 2), endpoint=True)
+    # Make sure the extreme corners themselves are hit
+    corners = np.array([[-1, -1], [-1, 1], [1, -1], [1, 1]]) * MAX_COORD
+    coords[: min(n, 4)] = corners[: min(n, 4)]
+    return coords
+
+
+def lattice_circle(n: int, rng: np.random.Generator, radius: int = 5525) -> np.ndarray:
+    """
+    Lattice points lying exactly on a circle, so that every distinct point is
+    a hull vertex. The default radius, 5^2 * 13 * 17, has 140 of them.
+    """
+    x = np.arange(-radius, radius + 1)
+    y = np.array([isqrt(radius * radius - int(v) * int(v)) for v in x])
+    exact = x * x + y * y == radius * radius
+    boundary = np.concatenate([
+        np.stack([x[exact], y[exact]], axis=1),
+        np.stack([x[exact], -y[exact]], axis=1),
+    ])
+    return boundary[rng.integers(0, len(boundary), n)]
+
+
+# Inputs to fuzz with, each returning an (n, 2) int64 array of coordinates
+CASES: Dict[str, Callable[[int, np.random.Generator], np.ndarray]] = {
+    **DISTRIBUTIONS,
+    'collinear': collinear,
+    'vertical': vertical,
+    'duplicates': duplicates,
+    'grid': grid,
+    'huge': huge,
+    'lattice_circle': lattice_circle,
+}
+
+
+def _cross(o: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Cross product of a - o and b - o: positive for a turn in hull order."""
+    return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - (
+        a[..., 1] - o[..., 1]
+    ) * (b[..., 0] - o[..., 0])
+
+
+def _as_array(points) -> np.ndarray:
+    """Integer points as int64, or as Python ints where int64 could overflow."""
+    coords = np.asarray(points).reshape(-1, 2)
+    if not coords.size:
+        return coords.astype(np.int64)
+    if coords.dtype == object:
+        return coords
+    if coords.dtype.kind not in 'iub':
+        raise ValueError('hulls can only be validated over integer coordinates')
+    if len(coords) and np.abs(coords).max() > MAX_COORD:
+        return coords.astype(object)
+    return coords.astype(np.int64)
+
+
+def _keys(coords: np.ndarray) -> np.ndarray:
+    """Keys ordering points by x, then by y."""
+    bound = MAX_COORD
+    if coords.dtype == object and len(coords):
+        bound = max(bound, int(np.abs(coords).max()))
+    return coords[:, 0] * (2 * bound + 2) + coords[:, 1]
+
+
+def validate_hull(hull, coords, allow_collinear: bool = False):
+    """ Checks that `hull` is the convex hull of `coords` in O(n log h).
+
+    The hull must consist of distinct input points in clockwise order (in the
+    sense of `is_clockwise`) forming a convex polygon that contains every
+    input point. Every point is located in the polygon's fan of triangles
+    around its lowest-leftmost vertex by a binary search, run for all points
+    at once with NumPy.
+
+    :param hull: the hull vertices, as a list of points or an (h, 2) array
+    :param coords: the input points, as an (n, 2) array
+    :param allow_collinear: whether vertices may lie on the edge between
+        their neighbours
+    :raises ValueError: describing the first problem found
+    """
+    coords = _as_array(coords)
+    hull = _as_array(hull)
+    if hull.dtype == object or coords.dtype == object:
+        coords, hull = coords.astype(object), hull.astype(object)
+    n, h = len(coords), len(hull)
+    if not n or not h:
+        if n or h:
+            raise ValueError(f'hull has {h} vertices for {n} points')
+        return
+
+    # Vertices must be distinct input points
+    keys = _keys(np.concatenate([coords, hull]))
+    keys, hull_keys = keys[:n], keys[n:]
+    order = np.argsort(hull_keys, kind='stable')
+    sorted_keys = hull_keys[order]
+    repeated = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+    if len(repeated):
+        vertex = tuple(hull[order[repeated[0]]].tolist())
+        raise ValueError(f'vertex {vertex} is repeated')
+    found = np.minimum(np.searchsorted(sorted_keys, keys), h - 1)
+    hit = sorted_keys[found] == keys
+    missing = np.setdiff1d(np.arange(h), found[hit])
+    if len(missing):
+        vertex = tuple(hull[order[missing[0]]].tolist())
+        raise ValueError(f'vertex {vertex} is not an input point')
+
+    # Starting from the lowest-leftmost vertex, the vertices must climb to the
+    # highest-rightmost one and come back, turning the same way throughout
+    start = int(np.argmin(hull_keys))
+    polygon = np.roll(hull, -start, axis=0)
+    polygon_keys = np.roll(hull_keys, -start)
+    top = int(np.argmax(polygon_keys))
+    rising = np.diff(polygon_keys[: top + 1])
+    falling = np.diff(np.append(polygon_keys[top:], polygon_keys[0]))
+    if h > 1 and ((rising <= 0).any() or (falling >= 0).any()):
+        raise ValueError('vertices are not in clockwise order')
+    turns = _cross(polygon, np.roll(polygon, -1, axis=0), np.roll(polygon, -2, axis=0))
+    bent = (turns < 0) if allow_collinear else (turns <= 0)
+    if h >= 3 and bent.any():
+        vertex = tuple(np.roll(polygon, -1, axis=0)[np.flatnonzero(bent)[0]].tolist())
+        raise ValueError(f'hull is not strictly convex at {vertex}')
+
+    # Every point must lie inside or on the polygon
+    first = polygon[0]
+    if h < 3 or not turns.any():
+        inside = (
+            (_cross(first, polygon[top], coords) == 0)
+            & (keys >= polygon_keys[0])
+            & (keys <= polygon_keys[top])
+        )
+    else:
+        low = np.ones(n, dtype=np.intp)
+        high = np.full(n, h - 1, dtype=np.intp)
+        while (high - low > 1).any():
+            middle = (low + high) // 2
+            ahead = _cross(first, polygon[middle], coords) >= 0
+            low = np.where(ahead, middle, low)
+            high = np.where(ahead, high, middle)
+        inside = (
+            (_cross(first, polygon[1], coords) >= 0)
+            & (_cross(first, polygon[-1], coords) <= 0)
+            & (_cross(polygon[low], polygon[low + 1], coords) >= 0)
+        )
+    if not inside.all():
+        point = tuple(coords[np.flatnonzero(~inside)[0]].tolist())
+        raise ValueError(f'point {point} lies outside the hull')
+
+
+def canonical_hull(hull) -> np.ndarray:
+    """
+    Returns the corners of a valid hull as an (h, 2) array, without vertices
+    on the edges between them, starting from the lowest-leftmost corner.
+    """
+    hull = _as_array(hull)
+    if len(hull) >= 3:
+        turns = _cross(np.roll(hull, 1, axis=0), hull, np.roll(hull, -1, axis=0))
+        if turns.any():
+            hull = hull[turns != 0]
+        else:
+            keys = _keys(hull)
+            hull = hull[[np.argmin(keys), np.argmax(keys)]]
+    if not len(hull):
+        return hull
+    return np.roll(hull, -int(np.argmin(_keys(hull))), axis=0)
+
+
+def run_differential(
+        coords: np.ndarray, engines: Optional[List[str]] = None
+) -> Dict[str, str]:
+    """ Runs every engine on the same input and checks each hull with
+    `validate_hull` and against the others.
+
+    :param coords: the input, as an (n, 2) integer array
+    :param engines: names of ENGINES to run (all of them by default)
+    :returns: an error message for every engine that failed
+    """
+    coords = np.asarray(coords).reshape(-1, 2)
+    points = list(map(tuple, coords.tolist()))
+    failures: Dict[str, str] = {}
+    reference = None
+    for name in engines or list(ENGINES):
+        if len(coords) > MAX_SIZES.get(name, len(coords)):
+            continue
+        try:
+            hull = ENGINES[name](coords, points)
+            validate_hull(hull, coords, allow_collinear=name in KEEPS_COLLINEAR)
+        except Exception as error:
+            failures[name] = f'{type(error).__name__}: {error}'
+            continue
+        corners = canonical_hull(hull)
+        if reference is None:
+            reference = (name, corners)
+        elif not np.array_equal(corners, reference[1]):
+            failures[name] = f'hull differs from that of {reference[0]}'
+    return failures
+
+
+def fuzz(
+        engines: List[str],
+        cases: List[str],
+        sizes: List[int],
+        rounds: int = 10,
+        seed: int = 0,
+        save_dir: Optional[str] = None,
+) -> List[Dict[str, object]]:
+    """ Runs `run_differential` on fresh inputs from every case and size.
+
+    Round r of every case and size draws its input from seed + r, so any
+    failure can be reproduced. Failing inputs are saved as point files in
+    `save_dir`, if given. Returns one record per failure.
+    """
+    failures: List[Dict[str, object]] = []
+    for case in cases:
+        for n in sizes:
+            for round_ in range(rounds):
+                coords = CASES[case](n, np.random.default_rng(seed + round_))
+                for engine, error in run_differential(coords, engines).items():
+                    record = {'case': case, 'n': n, 'seed': seed + round_,
+                              'engine': engine, 'error': error}
+                    if save_dir:
+                        record['path'] = os.path.join(
+                            save_dir, f'{case}-{n}-{seed + round_}.pnts')
+                        save_points(record['path'], coords)
+                    print(' '.join(f'{key}={value}' for key, value in record.items()),
+                          file=sys.stderr)
+                    failures.append(record)
+            print(f'{case} n={n}: {rounds} rounds', file=sys.stderr)
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Differentially test the convex hull engines against each other.')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES),
+                        default=list(ENGINES))
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[3, 10, 100, 10_000])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='directory to save failing inputs to')
+    args = parser.parse_args(argv)
+
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+    failures = fuzz(args.engines, args.cases, args.sizes, args.rounds, args.seed,
+                    args.save)
+    print(f'{len(failures)} failures', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+
+from batch_hull import batch_hulls
+from batch_hull import hull_array
+
+CellSize = Union[float, Tuple[float, float]]
+
+
+class GridHulls:
+    """
+    Convex hulls of the points in every occupied cell of a grid.
+
+    - `cells` is the (k, 2) array of the (column, row) indices of the
+      occupied cells, sorted by column and then by row.
+    - The hull of cell i is `coords[offsets[i]:offsets[i + 1]]`, in clockwise
+      order as returned by `batch_hulls`.
+
+    Cell (i, j) covers the points with origin + (i, j) * cell_size <= point
+    < origin + (i + 1, j + 1) * cell_size.
+    """
+
+    def __init__(
+        self,
+        cell_size: np.ndarray,
+        origin: np.ndarray,
+        cells: np.ndarray,
+        offsets: np.ndarray,
+        coords: np.ndarray,
+    ):
+        self.cell_size = cell_size
+        self.origin = origin
+        self.cells = cells
+        self.offsets = offsets
+        self.coords = coords
+
+    def __len__(self) -> int:
+        """Number of occupied cells."""
+        return len(self.cells)
+
+    def cell_of(self, point) -> Tuple[int, int]:
+        """The (column, row) indices of the cell containing `point`."""
+        column, row = (np.asarray(point) - self.origin) // self.cell_size
+        return int(column), int(row)
+
+    def index(self, cell: Tuple[int, int]) -> int:
+        """
+        The position of `cell` in `cells`, found by binary search. Raises
+        KeyError if the cell holds no points.
+        """
+        column, row = cell
+        low = np.searchsorted(self.cells[:, 0], column, side='left')
+        high = np.searchsorted(self.cells[:, 0], column, side='right')
+        i = low + np.searchsorted(self.cells[low:high, 1], row)
+        if i == high or self.cells[i, 1] != row:
+            raise KeyError(cell)
+        return int(i)
+
+    def hull(self, cell: Tuple[int, int]) -> np.ndarray:
+        """The (h, 2) array of hull vertices of the points in `cell`."""
+        i = self.index(cell)
+        return self.coords[self.offsets[i] : self.offsets[i + 1]]
+
+    def global_hull(self) -> np.ndarray:
+        """
+        The hull of all the points, computed from the cell hull vertices
+        alone: every vertex of the overall hull is a vertex of the hull of
+        whichever cell contains it.
+        """
+        return hull_array(self.coords)
+
+
+def grid_hulls(
+    coords: np.ndarray,
+    cell_size: CellSize,
+    origin: Tuple[float, float] = (0, 0),
+    processes: Optional[int] = None,
+) -> GridHulls:
+    """
+    Buckets an (n, 2) array of points into square (or, given a pair of sizes,
+    rectangular) grid cells and computes the hull of every occupied cell.
+
+    The points are bucketed by one vectorized sort on their cell indices,
+    which lays them out as the ragged array `batch_hulls` takes, so all the
+    cell hulls are computed together with whole-array NumPy operations (and
+    optionally a process pool) instead of one Python call per cell.
+    """
+    coords = np.asarray(coords).reshape(-1, 2)
+    if coords.dtype.kind in 'iub':
+        coords = coords.astype(np.int64)
+    cell_size = np.broadcast_to(np.asarray(cell_size), (2,))
+    if (cell_size <= 0).any():
+        raise ValueError('cell size must be positive')
+    origin = np.asarray(origin)
+
+    cells = ((coords - origin) // cell_size).astype(np.int64)
+    order = np.lexsort((cells[:, 1], cells[:, 0]))
+    cells = cells[order]
+    first = np.ones(len(cells), dtype=bool)
+    first[1:] = (cells[1:] != cells[:-1]).any(axis=1)
+    starts = np.flatnonzero(first)
+    offsets = np.append(starts, len(coords))
+
+    hull_offsets, hull_coords = batch_hulls(offsets, coords[order], processes)
+    return GridHulls(cell_size, origin, cells[starts], hull_offsets, hull_coords)
@@ -0,0 +1,371 @@
+from fractions import Fraction
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import numpy as np
+
+Point3 = Tuple[int, int, int]
+
+# Bound on the relative rounding error of a float dot product of three terms,
+# with room to spare for the rounding of the face normal itself
+FLOAT_BOUND = 8 * np.finfo(np.float64).eps
+
+# Number of point/face pairs tested at once when handing out outside points
+BLOCK_SIZE = 1 << 22
+
+
+def _sub(a: Point3, b: Point3) -> Point3:
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _cross(a: Point3, b: Point3) -> Point3:
+    return (
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    )
+
+
+def _dot(a: Point3, b: Point3) -> int:
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def orient3d(a: Point3, b: Point3, c: Point3, d: Point3) -> int:
+    """
+    Six times the signed volume of the tetrahedron a, b, c, d: positive when
+    d lies above the plane through a, b and c, i.e. on the side from which
+    a, b, c appear counter-clockwise. Exact for integer coordinates.
+    """
+    return _dot(_cross(_sub(b, a), _sub(c, a)), _sub(d, a))
+
+
+class Hull3D:
+    """
+    Convex polytope as a triangle mesh in array-backed half-edge form.
+
+    - `vertices` is the (m, 3) array of hull vertices.
+    - `faces` is the (f, 3) array of vertex indices of every triangle,
+      counter-clockwise as seen from outside.
+    - Half-edge 3 * i + k runs from faces[i, k] to faces[i, (k + 1) % 3], so
+      the next half-edge around a face is implicit, and `twins[e]` is the
+      half-edge running the opposite way along the same edge.
+
+    Coplanar faces are not merged, so a flat facet may be split into several
+    triangles.
+    """
+
+    def __init__(self, vertices: np.ndarray, faces: np.ndarray, twins: np.ndarray):
+        self.vertices = vertices
+        self.faces = faces
+        self.twins = twins
+
+    def __len__(self) -> int:
+        """Number of hull vertices."""
+        return len(self.vertices)
+
+    def _triangles(self) -> List[Tuple[Point3, Point3, Point3]]:
+        points = [tuple(p) for p in _exact(self.vertices)]
+        return [(points[a], points[b], points[c]) for a, b, c in self.faces.tolist()]
+
+    def contains(self, point: Point3) -> bool:
+        """Returns True if and only if `point` lies inside or on the hull."""
+        point = tuple(_exact(np.asarray([point]))[0])
+        return all(orient3d(a, b, c, point) <= 0 for a, b, c in self._triangles())
+
+    def volume(self) -> float:
+        """Volume enclosed by the hull, summed exactly before rounding."""
+        total = sum(_dot(a, _cross(b, c)) for a, b, c in self._triangles())
+        return float(Fraction(total) / 6)
+
+
+def _exact(coords: np.ndarray) -> list:
+    """Coordinates as Python numbers that `orient3d` evaluates exactly."""
+    if coords.dtype.kind == 'f':
+        return [[Fraction(c) for c in row] for row in coords.tolist()]
+    return coords.tolist()
+
+
+class _QuickHull:
+    """
+    QuickHull over distinct points: every face keeps the array of points
+    strictly above it (its outside set). The furthest point above a face is
+    added by replacing all the faces it sees with a fan of new faces around
+    their horizon, and the orphaned outside points are handed to the new
+    faces with a single vectorized plane test.
+
+    Plane tests run in float64 with an error bound, and only points within
+    the bound of a plane are re-tested exactly.
+    """
+
+    def __init__(self, points: np.ndarray):
+        self.points = points
+        self.coords = points.astype(np.float64)
+        self.faces: List[Tuple[int, int, int]] = []
+        self.normals: List[Point3] = []
+        self.alive: List[bool] = []
+        # Outside set of every face, with the points' approximate heights
+        self.outside: List[np.ndarray] = []
+        self.heights: List[np.ndarray] = []
+        # Half-edge (u, v) -> the face it belongs to
+        self.edges: Dict[Tuple[int, int], int] = {}
+        # Exact coordinates of the points used so far
+        self.cache: Dict[int, Point3] = {}
+
+    def exact(self, i: int) -> Point3:
+        point = self.cache.get(i)
+        if point is None:
+            point = self.cache[i] = tuple(_exact(self.points[i : i + 1])[0])
+        return point
+
+    def add_face(self, a: int, b: int, c: int) -> int:
+        pa, pb, pc = self.exact(a), self.exact(b), self.exact(c)
+        face = len(self.faces)
+        self.faces.append((a, b, c))
+        self.normals.append(_cross(_sub(pb, pa), _sub(pc, pa)))
+        self.alive.append(True)
+        self.outside.append(None)
+        self.heights.append(None)
+        self.edges[a, b] = self.edges[b, c] = self.edges[c, a] = face
+        return face
+
+    def sees(self, point: Point3, face: int) -> bool:
+        """Whether `point` is strictly above `face`, exactly."""
+        apex = self.exact(self.faces[face][0])
+        return _dot(self.normals[face], _sub(point, apex)) > 0
+
+    def assign(self, faces: List[int], candidates: np.ndarray) -> List[int]:
+        """
+        Gives each candidate to the first face it is strictly above, dropping
+        the rest. Returns the faces that got any.
+
+        The faces are tested in blocks, so that the (candidates x faces)
+        height matrix stays at about BLOCK_SIZE entries.
+        """
+        busy = []
+        start = 0
+        while start < len(faces) and len(candidates):
+            step = max(1, BLOCK_SIZE // len(candidates))
+            block = faces[start : start + step]
+            candidates = self._assign_block(block, candidates, busy)
+            start += step
+        return busy
+
+    def _assign_block(
+        self, faces: List[int], candidates: np.ndarray, busy: List[int]
+    ) -> np.ndarray:
+        """Assigns candidates to one block of faces; returns the unassigned ones."""
+        normals = np.array([[float(c) for c in self.normals[f]] for f in faces])
+        apexes = self.coords[[self.faces[f][0] for f in faces]]
+        points = self.coords[candidates]
+        heights = points @ normals.T - (apexes * normals).sum(axis=1)
+        bound = FLOAT_BOUND * (
+            np.abs(points) @ np.abs(normals).T
+            + (np.abs(apexes) * np.abs(normals)).sum(axis=1)
+        )
+        above = heights > bound
+        for row, column in zip(*np.nonzero(np.abs(heights) <= bound)):
+            above[row, column] = self.sees(self.exact(candidates[row]), faces[column])
+
+        owned = above.any(axis=1)
+        owner = above.argmax(axis=1)[owned]
+        order = np.argsort(owner, kind='stable')
+        members = candidates[owned][order]
+        heights = heights[owned, owner][order]
+        ends = np.cumsum(np.bincount(owner, minlength=len(faces))).tolist()
+
+        start = 0
+        for face, end in zip(faces, ends):
+            if end > start:
+                self.outside[face] = members[start:end]
+                self.heights[face] = heights[start:end]
+                busy.append(face)
+            start = end
+        return candidates[~owned]
+
+    def initial_simplex(self) -> Tuple[int, int, int, int]:
+        """
+        Finds four affinely independent hull vertices, or raises ValueError:
+        the lexicographically smallest and largest points, the point
+        furthest from the line through them, and the point furthest from the
+        plane through all three.
+        """
+        if len(self.points) < 4:
+            raise ValueError('a 3D hull needs at least 4 distinct points')
+        order = np.lexsort(self.points.T[::-1])
+        a, b = int(order[0]), int(order[-1])
+        indices = np.arange(len(self.points))
+        offsets = self.coords - self.coords[a]
+        lengths = np.sqrt((offsets * offsets).sum(axis=1))
+
+        crosses = np.cross(offsets, offsets[b])
+        pa, pb = self.exact(a), self.exact(b)
+
+        def line_distance(p: Point3) -> int:
+            """Squared distance from the line ab, times |ab|^2."""
+            cross = _cross(_sub(pb, pa), _sub(p, pa))
+            return _dot(cross, cross)
+
+        c = self._furthest(
+            indices,
+            (crosses * crosses).sum(axis=1),
+            4 * FLOAT_BOUND * (lengths * lengths[b]) ** 2,
+            line_distance,
+        )
+        if c is None:
+            raise ValueError('points are collinear')
+
+        pc = self.exact(c)
+        d = self._furthest(
+            indices,
+            np.abs(offsets @ np.cross(offsets[b], offsets[c])),
+            4 * FLOAT_BOUND * lengths * lengths[b] * lengths[c],
+            lambda p: abs(orient3d(pa, pb, pc, p)),
+        )
+        if d is None:
+            raise ValueError('points are coplanar')
+        return a, b, c, d
+
+    def _furthest(
+        self, indices: np.ndarray, scores: np.ndarray, bounds: np.ndarray, exact
+    ):
+        """
+        The index among `indices` with the highest positive `exact` score,
+        or None. Only points whose float `scores` come within their error
+        `bounds` of the best are scored exactly.
+
+        Ties go to the lexicographically smallest point, which is always an
+        extreme point of the tied ones. The furthest points from a line or a
+        plane lie on an edge or a face of the hull, so this picks one of its
+        corners rather than a point inside that edge or face.
+        """
+        near = indices[scores + bounds >= (scores - bounds).max()].tolist()
+        best = min(near, key=lambda i: (-exact(self.exact(i)), self.exact(i)))
+        return best if exact(self.exact(best)) > 0 else None
+
+    def build(self) -> Hull3D:
+        a, b, c, d = self.initial_simplex()
+        if orient3d(*(self.exact(i) for i in (a, b, c, d))) > 0:
+            b, c = c, b
+        # d is now below (a, b, c), so these faces all point outwards
+        faces = [
+            self.add_face(a, b, c),
+            self.add_face(a, d, b),
+            self.add_face(b, d, c),
+            self.add_face(c, d, a),
+        ]
+        candidates = np.arange(len(self.points))
+        candidates = candidates[~np.isin(candidates, [a, b, c, d])]
+        pending = self.assign(faces, candidates)
+
+        while pending:
+            face = pending.pop()
+            if not self.alive[face]:
+                continue
+            pending.extend(self.add_point(face))
+
+        # A point added early can end up inside an edge or a facet of the
+        # final hull. No face is ever strictly visible from there, so it is
+        # never removed; rebuilding from the corners alone drops it.
+        live = [f for f, alive in enumerate(self.alive) if alive]
+        flat = self.flat_vertices(live)
+        if flat:
+            corners = {v for f in live for v in self.faces[f]} - flat
+            return _QuickHull(self.points[sorted(corners)]).build()
+        return self.result()
+
+    def flat_vertices(self, live: List[int]) -> set:
+        """
+        The vertices of the `live` faces whose face normals do not span three
+        dimensions: they lie inside an edge or a facet, not at a corner.
+        """
+        spans: Dict[int, List[Point3]] = {}
+        for face in live:
+            normal = self.normals[face]
+            for v in self.faces[face]:
+                basis = spans.setdefault(v, [])
+                if (
+                    not basis
+                    or (len(basis) == 1 and any(_cross(basis[0], normal)))
+                    or (len(basis) == 2 and orient3d((0, 0, 0), *basis, normal))
+                ):
+                    basis.append(normal)
+        return {v for v, basis in spans.items() if len(basis) < 3}
+
+    def add_point(self, face: int) -> List[int]:
+        """
+        Adds the furthest point above `face` to the hull. Returns the new
+        faces that have outside points of their own.
+        """
+        eye = int(self.outside[face][np.argmax(self.heights[face])])
+        eye_point = self.exact(eye)
+
+        # The faces the eye sees form a connected patch around `face`
+        visible = {face}
+        hidden = set()
+        horizon = []
+        stack = [face]
+        while stack:
+            current = stack.pop()
+            u, v, w = self.faces[current]
+            for edge in ((u, v), (v, w), (w, u)):
+                neighbour = self.edges[edge[1], edge[0]]
+                if neighbour in visible:
+                    continue
+                if neighbour not in hidden:
+                    if self.sees(eye_point, neighbour):
+                        visible.add(neighbour)
+                        stack.append(neighbour)
+                        continue
+                    hidden.add(neighbour)
+                horizon.append(edge)
+
+        orphans = []
+        for current in visible:
+            self.alive[current] = False
+            if self.outside[current] is not None:
+                orphans.append(self.outside[current])
+            self.outside[current] = self.heights[current] = None
+            u, v, w = self.faces[current]
+            for edge in ((u, v), (v, w), (w, u)):
+                if self.edges.get(edge) == current:
+                    del self.edges[edge]
+        orphans = np.concatenate(orphans)
+
+        new_faces = [self.add_face(u, v, eye) for u, v in horizon]
+        return self.assign(new_faces, orphans[orphans != eye])
+
+    def result(self) -> Hull3D:
+        live = [f for f, alive in enumerate(self.alive) if alive]
+        faces = np.array([self.faces[f] for f in live], dtype=np.intp)
+        used, local = np.unique(faces, return_inverse=True)
+        local = local.reshape(-1, 3)
+
+        # Half-edge ids, and each one's twin via the (v, u) lookup
+        position = {face: i for i, face in enumerate(live)}
+        twins = np.empty(3 * len(live), dtype=np.intp)
+        for i, face in enumerate(live):
+            corners = self.faces[face]
+            for k in range(3):
+                u, v = corners[k], corners[(k + 1) % 3]
+                other = self.edges[v, u]
+                twins[3 * i + k] = 3 * position[other] + self.faces[other].index(v)
+        return Hull3D(self.points[used], local.astype(np.int32), twins.astype(np.int32))
+
+
+def hull3d(points) -> Hull3D:
+    """
+    Computes the convex hull of an (n, 3) array (or a list) of 3D points with
+    QuickHull. Orientation tests are exact for integer coordinates below 2^52
+    in magnitude; float coordinates are compared exactly as Fractions when
+    the float test is inconclusive.
+
+    Repeated points need no special handling: a copy of a hull vertex is
+    never strictly above a face through that vertex, so it is dropped.
+
+    Raises ValueError if the points do not span three dimensions.
+    """
+    points = np.asarray(points).reshape(-1, 3)
+    if points.dtype.kind in 'iub':
+        points = points.astype(np.int64)
+    return _QuickHull(points).build()
@@ -0,0 +1,228 @@
+from bisect import bisect_left
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+from convex_hull import Point
+from convex_hull import chain_tangent
+from convex_hull import compute_hull
+from convex_hull import improves
+from convex_hull import join_chains
+from convex_hull import monotone_chains
+from convex_hull import triangle_area
+
+
+def _tangent_before(chain: List[Point], origin: Point, upper: bool) -> Point:
+    """
+    Mirror image of `chain_tangent`: the vertex reached by gift-wrapping
+    leftwards from `origin` over the chain vertices that precede it.
+    """
+    low = 0
+    high = bisect_left(chain, origin) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        # Walking leftwards turns the sense of "outside" around
+        if improves(origin, chain[middle], chain[middle - 1], not upper):
+            high = middle - 1
+        else:
+            low = middle
+    return chain[low]
+
+
+class Hull:
+    """
+    Query index over a convex hull.
+
+    The hull is stored as its lower and upper chains sorted by x, so every
+    query is a binary search over one chain:
+
+    - `contains(point)` in O(log h),
+    - `extreme(direction)` in O(log h),
+    - `tangents_from(point)` in O(log h),
+
+    and `contains_many` / `extreme_many` answer whole arrays of queries with
+    NumPy. Coordinates are compared exactly for integers; batched queries on
+    integer input use int64 arithmetic, so coordinates should stay below 2^31.
+    """
+
+    def __init__(self, vertices: List[Point]):
+        """Takes the vertices of a hull, e.g. the output of `compute_hull`."""
+        self.lower, self.upper = monotone_chains(sorted(set(map(tuple, vertices))))
+        self.vertices = join_chains(self.lower, self.upper)
+
+        self._lower_xy = np.array(self.lower).reshape(-1, 2)
+        self._upper_xy = np.array(self.upper).reshape(-1, 2)
+
+    def __len__(self) -> int:
+        return len(self.vertices)
+
+    def contains(self, point: Point) -> bool:
+        """Returns True if and only if `point` lies inside or on the hull."""
+        if not self.vertices:
+            return False
+        point = tuple(point)
+        for chain, sign in ((self.upper, 1), (self.lower, -1)):
+            index = bisect_left(chain, point)
+            if index == len(chain):
+                return False
+            if chain[index] == point:
+                return True
+            if index == 0:
+                return False
+            if sign * triangle_area(chain[index - 1], point, chain[index]) > 0:
+                return False
+        return True
+
+    def extreme(self, direction: Tuple[float, float]) -> Point:
+        """Returns a hull vertex p maximizing the dot product of `direction` and p."""
+        if not self.vertices:
+            raise ValueError("extreme point of an empty hull")
+        dx, dy = direction
+        if dy == 0:
+            if dx == 0:
+                raise ValueError("direction must be non-zero")
+            return self.upper[-1] if dx > 0 else self.upper[0]
+
+        # The dot product rises and then falls along the facing chain
+        chain = self.upper if dy > 0 else self.lower
+        low, high = 0, len(chain) - 1
+        while low < high:
+            middle = (low + high) // 2
+            a, b = chain[middle], chain[middle + 1]
+            if dx * b[0] + dy * b[1] > dx * a[0] + dy * a[1]:
+                low = middle + 1
+            else:
+                high = middle
+        return chain[low]
+
+    def tangents_from(self, point: Point) -> Optional[Tuple[Point, Point]]:
+        """
+        Returns the two hull vertices (u, v) touched by the tangent lines from
+        `point`, ordered so that `point`, u, v is not counter-clockwise.
+        Returns None if `point` lies inside or on the hull.
+        """
+        if not self.vertices or self.contains(point):
+            return None
+        point = tuple(point)
+        lower, upper = self.lower, self.upper
+
+        if point < upper[0]:
+            first = chain_tangent(upper, point, True)
+            second = chain_tangent(lower, point, False)
+        elif point > upper[-1]:
+            first = _tangent_before(upper, point, True)
+            second = _tangent_before(lower, point, False)
+        else:
+            # Above the upper chain or below the lower one: both tangents
+            # touch that chain, one on each side of the point
+            index = bisect_left(upper, point)
+            is_upper = triangle_area(upper[index - 1], point, upper[index]) > 0
+            chain = upper if is_upper else lower
+            first = _tangent_before(chain, point, is_upper)
+            second = chain_tangent(chain, point, is_upper)
+
+        if triangle_area(point, first, second) > 0:
+            first, second = second, first
+        return first, second
+
+    def contains_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Vectorized `contains`: takes an (n, 2) array of query points and
+        returns a boolean array of length n.
+        """
+        points = np.asarray(points)
+        if points.dtype.kind in "iub":
+            points = points.astype(np.int64)
+        x, y = points[:, 0], points[:, 1]
+        if not self.vertices:
+            return np.zeros(len(points), dtype=bool)
+
+        lower, upper = self._lower_xy, self._upper_xy
+        x_min, x_max = upper[0, 0], upper[-1, 0]
+        inside = (x >= x_min) & (x <= x_max)
+
+        # Only the upper chain can start with a vertical edge, and only the
+        # lower chain can end with one; those are checked separately below
+        inside &= ~_above_chain(upper, x, y)
+        inside &= ~_above_chain(lower * [1, -1], x, -y)
+
+        left_top = upper[0, 1]
+        if len(upper) > 1 and upper[1, 0] == x_min:
+            left_top = upper[1, 1]
+        at_left = x == x_min
+        inside[at_left] = (y[at_left] >= upper[0, 1]) & (y[at_left] <= left_top)
+
+        right_bottom = lower[-1, 1]
+        if len(lower) > 1 and lower[-2, 0] == x_max:
+            right_bottom = lower[-2, 1]
+        at_right = x == x_max
+        inside[at_right] = (y[at_right] >= right_bottom) & (
+            y[at_right] <= upper[-1, 1]
+        )
+        return inside
+
+    def extreme_many(self, directions: np.ndarray) -> np.ndarray:
+        """
+        Vectorized `extreme`: takes an (n, 2) array of non-zero directions
+        and returns an (n, 2) array of extreme vertices. Raises ValueError,
+        as `extreme` does, for an empty hull or any zero direction.
+
+        Runs one binary search per chain for all directions at once.
+        """
+        if not self.vertices:
+            raise ValueError("extreme point of an empty hull")
+        directions = np.asarray(directions)
+        dx, dy = directions[:, 0], directions[:, 1]
+        zero = np.flatnonzero((dx == 0) & (dy == 0))
+        if len(zero):
+            raise ValueError("direction %d must be non-zero" % zero[0])
+        result = np.empty((len(directions), 2), dtype=self._upper_xy.dtype)
+
+        for chain, facing in ((self._upper_xy, dy > 0), (self._lower_xy, dy < 0)):
+            cx, cy = dx[facing], dy[facing]
+            low = np.zeros(len(cx), dtype=np.intp)
+            high = np.full(len(cx), len(chain) - 1, dtype=np.intp)
+            while np.any(low < high):
+                middle = (low + high) // 2
+                a = chain[middle]
+                b = chain[np.minimum(middle + 1, len(chain) - 1)]
+                rising = cx * b[:, 0] + cy * b[:, 1] > cx * a[:, 0] + cy * a[:, 1]
+                active = low < high
+                low = np.where(active & rising, middle + 1, low)
+                high = np.where(active & ~rising, middle, high)
+            result[facing] = chain[low]
+
+        level = dy == 0
+        result[level & (dx > 0)] = self._upper_xy[-1]
+        result[level & (dx < 0)] = self._upper_xy[0]
+        return result
+
+
+def _above_chain(chain: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    For query points strictly inside the chain's x-range, whether they lie
+    strictly above the chain (other points get False).
+    """
+    if len(chain) < 2:
+        return np.zeros(len(x), dtype=bool)
+    index = np.searchsorted(chain[:, 0], x, side="right")
+    index = np.clip(index, 1, len(chain) - 1)
+    a, b = chain[index - 1], chain[index]
+    cross = (b[:, 0] - a[:, 0]) * (y - a[:, 1]) - (b[:, 1] - a[:, 1]) * (
+        x - a[:, 0]
+    )
+    interior = (x > chain[0, 0]) & (x < chain[-1, 0])
+    return interior & (cross > 0)
+
+
+def build_hull(
+    points: List[Point], engine: Callable[[List[Point]], List[Point]] = compute_hull
+) -> Hull:
+    """
+    Computes the convex hull of `points` with `engine` (any function with the
+    signature of `compute_hull`) and returns it as a queryable `Hull`.
+    """
+    return Hull(engine(points))
@@ -0,0 +1,100 @@
+from bisect import bisect_left
+from typing import Iterable
+from typing import List
+
+from convex_hull import Point
+from convex_hull import triangle_area
+
+
+class IncrementalHull:
+    """
+    Online convex hull for a stream of points.
+
+    The hull is kept as two monotone chains, each sorted by ascending x
+    (ties broken by ascending y):
+
+    - the lower chain, whose consecutive triples are all strictly clockwise
+      (in the sense of `is_clockwise`), and
+    - the upper chain, whose consecutive triples are all strictly
+      counter-clockwise.
+
+    Both chains share their first and last points. A new point is located in
+    each chain with a binary search, so a point inside the hull costs
+    O(log h). Otherwise the chain vertices it hides are found by walking
+    outwards from it, amortized O(1) comparisons since every point leaves a
+    chain at most once, and replaced by the point in one slice assignment.
+    That shifts the rest of the chain's list, so an insertion that changes
+    the hull takes O(h) time, though only as a single move of h pointers.
+    """
+
+    def __init__(self, points: Iterable[Point] = ()):
+        self._lower: List[Point] = []
+        self._upper: List[Point] = []
+        self.extend(points)
+
+    def __len__(self) -> int:
+        """Number of vertices on the current hull."""
+        if len(self._lower) <= 1:
+            return len(self._lower)
+        return len(self._lower) + len(self._upper) - 2
+
+    def insert(self, point: Point) -> bool:
+        """
+        Adds `point` to the point set.
+        Returns True if and only if the hull changed.
+        """
+        point = tuple(point)
+        lower_changed = self._insert_into_chain(self._lower, point, -1)
+        upper_changed = self._insert_into_chain(self._upper, point, 1)
+        return lower_changed or upper_changed
+
+    def extend(self, points: Iterable[Point]) -> bool:
+        """
+        Adds every point produced by `points`, which may be any iterable
+        (including a generator). Returns True if the hull changed.
+        """
+        changed = False
+        for point in points:
+            changed = self.insert(point) or changed
+        return changed
+
+    def hull(self) -> List[Point]:
+        """Returns the current hull in clockwise order."""
+        if len(self._lower) <= 1:
+            return list(self._lower)
+        # Walk the lower chain left to right, then the upper chain back
+        return self._lower + self._upper[-2:0:-1]
+
+    @staticmethod
+    def _insert_into_chain(chain: List[Point], point: Point, sign: int) -> bool:
+        """
+        Inserts `point` into a monotone chain, where `sign` is -1 for the lower
+        chain and 1 for the upper chain. A point that lies on or inside the
+        chain is ignored. Returns True if the chain changed.
+        """
+        index = bisect_left(chain, point)
+        if index < len(chain) and chain[index] == point:
+            return False
+
+        # Points between two chain vertices are hidden unless they are
+        # strictly outside the edge joining them
+        if 0 < index < len(chain):
+            if sign * triangle_area(chain[index - 1], point, chain[index]) <= 0:
+                return False
+
+        # Vertices to the left that would no longer be strictly convex
+        start = index
+        while start >= 2 and sign * triangle_area(
+            chain[start - 2], chain[start - 1], point
+        ) <= 0:
+            start -= 1
+
+        # Likewise to the right
+        stop = index
+        while stop + 1 < len(chain) and sign * triangle_area(
+            point, chain[stop], chain[stop + 1]
+        ) <= 0:
+            stop += 1
+
+        chain[start:stop] = [point]
+        return True
@@ -0,0 +1,176 @@
+import struct
+from itertools import islice
+from typing import Iterator
+from typing import Union
+
+import numpy as np
+
+# A point file is a 16-byte header followed by the coordinates as packed
+# little-endian (x, y) pairs:
+#
+#   magic (4 bytes) | dtype (4 bytes, e.g. b'<i4 ') | point count (uint64)
+MAGIC = b'PNTS'
+HEADER = struct.Struct('<4s4sQ')
+DTYPES = (np.dtype('<i4'), np.dtype('<i8'), np.dtype('<f8'))
+
+PathLike = Union[str, bytes]
+
+
+def _file_dtype(dtype) -> np.dtype:
+    dtype = np.dtype(dtype).newbyteorder('<')
+    if dtype not in DTYPES:
+        raise ValueError(
+            f'unsupported point dtype {dtype}, expected int32, int64 or float64')
+    return dtype
+
+
+def _pack_header(dtype: np.dtype, count: int) -> bytes:
+    return HEADER.pack(MAGIC, dtype.str.encode().ljust(4), count)
+
+
+def read_header(path: PathLike):
+    """Returns the (dtype, point count) recorded in a point file's header."""
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f'{path!r} is too short to be a point file')
+    magic, dtype, count = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f'{path!r} is not a point file')
+    return _file_dtype(dtype.decode().strip()), count
+
+
+class PointWriter:
+    """
+    Streams points into a point file chunk by chunk, so files larger than
+    memory can be written. Use as a context manager; the header's point count
+    is filled in on close.
+    """
+
+    def __init__(self, path: PathLike, dtype=np.int64):
+        self.dtype = _file_dtype(dtype)
+        self.count = 0
+        self._file = open(path, 'wb')
+        self._file.write(_pack_header(self.dtype, 0))
+
+    def write(self, coords: np.ndarray):
+        """Appends an (n, 2) array of points."""
+        coords = np.asarray(coords).reshape(-1, 2)
+        coords = np.ascontiguousarray(coords, dtype=self.dtype)
+        self._file.write(coords.data)
+        self.count += len(coords)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(_pack_header(self.dtype, self.count))
+        self._file.close()
+
+    def __enter__(self) -> 'PointWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save_points(path: PathLike, coords: np.ndarray, dtype=None):
+    """
+    Writes an (n, 2) array (or a list of points) to a point file. The dtype
+    defaults to that of the array, widened to int64 or float64 if needed.
+    """
+    coords = np.asarray(coords).reshape(-1, 2)
+    if dtype is None:
+        dtype = coords.dtype if coords.dtype in DTYPES else np.float64
+        if coords.dtype.kind in 'iub' and coords.dtype != np.int32:
+            dtype = np.int64
+    with PointWriter(path, dtype) as writer:
+        writer.write(coords)
+
+
+def load_points(path: PathLike, mmap: bool = True) -> np.ndarray:
+    """
+    Returns the points in a point file as an (n, 2) array.
+
+    With `mmap`, the array is a read-only memory-mapped view of the file:
+    nothing is read until it is used, and slices of it stay zero-copy, so it
+    can be passed to the vectorized hull functions (e.g. `hull_array`) or
+    walked in chunks with `iter_chunks` however large the file is.
+    """
+    dtype, count = read_header(path)
+    if mmap:
+        if count == 0:
+            return np.empty((0, 2), dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size,
+                         shape=(count, 2))
+    with open(path, 'rb') as file:
+        file.seek(HEADER.size)
+        return np.fromfile(file, dtype=dtype, count=2 * count).reshape(count, 2)
+
+
+def iter_chunks(coords: np.ndarray, chunk_size: int) -> Iterator[np.ndarray]:
+    """Yields consecutive views of at most `chunk_size` rows of `coords`."""
+    for start in range(0, len(coords), chunk_size):
+        yield coords[start:start + chunk_size]
+
+
+def iter_csv(
+        path: PathLike,
+        chunk_size: int = 1 << 20,
+        dtype=np.int64,
+        delimiter: str = ',',
+        skip_header: int = 0,
+) -> Iterator[np.ndarray]:
+    """
+    Parses a CSV file of x,y rows into (n, 2) arrays of at most `chunk_size`
+    points each, without ever holding more than one chunk of text.
+    """
+    with open(path) as file:
+        for _ in range(skip_header):
+            next(file, None)
+        while True:
+            lines = list(islice(file, chunk_size))
+            if not lines:
+                return
+            chunk = np.loadtxt(lines, dtype=dtype, delimiter=delimiter, ndmin=2)
+            if chunk.size:
+                yield chunk.reshape(-1, 2)
+
+
+def load_csv(
+        path: PathLike,
+        dtype=np.int64,
+        delimiter: str = ',',
+        skip_header: int = 0,
+) -> np.ndarray:
+    """Reads a CSV file of x,y rows into an (n, 2) array."""
+    chunks = list(iter_csv(path, dtype=dtype, delimiter=delimiter,
+                           skip_header=skip_header))
+    if not chunks:
+        return np.empty((0, 2), dtype=dtype)
+    return np.concatenate(chunks)
+
+
+def csv_to_points(
+        csv_path: PathLike,
+        path: PathLike,
+        dtype=np.int64,
+        delimiter: str = ',',
+        skip_header: int = 0,
+) -> int:
+    """
+    Converts a CSV file of x,y rows into a point file, one chunk at a time.
+    Returns the number of points written.
+    """
+    with PointWriter(path, dtype) as writer:
+        for chunk in iter_csv(csv_path, dtype=dtype, delimiter=delimiter,
+                              skip_header=skip_header):
+            writer.write(chunk)
+    return writer.count
+
+
+def save_csv(path: PathLike, coords: np.ndarray, delimiter: str = ','):
+    """Writes an (n, 2) array as CSV rows of x,y."""
+    coords = np.asarray(coords).reshape(-1, 2)
+    fmt = '%d' if coords.dtype.kind in 'iub' else '%.17g'
+    np.savetxt(path, coords, fmt=fmt, delimiter=delimiter)
@@ -1,17 +1,59 @@
+import math
+import os
+import tempfile
 import unittest
 from collections import deque
+from fractions import Fraction
 from typing import List
+from unittest import mock
 
+from hypothesis import assume
 from hypothesis import given
 from hypothesis import strategies as st
+import numpy as np
 
 from convex_hull import Point
 from convex_hull import sort_clockwise
+from convex_hull import chan_hull
+from convex_hull import collinear
+from convex_hull import clockwise_order
 from convex_hull import compute_hull
 from convex_hull import is_clockwise
 from convex_hull import is_counter_clockwise
+from convex_hull import pseudo_angle
+from convex_hull import tangent
 from convex_hull import y_intercept
 
+from batch_hull import PEEL_ROUNDS
+from batch_hull import batch_hulls
+from batch_hull import peel_chain
+from benchmarks import atan2_sort_clockwise
+from calipers import batch_diameters
+from calipers import batch_min_area_rectangles
+from calipers import batch_widths
+from calipers import diameter
+from calipers import farthest_pairs
+from calipers import min_area_rectangle
+from calipers import width
+from chunked_hull import chunked_hull
+from convex_layers import convex_layers
+from dynamic_hull import DynamicHull
+from fuzz_hull import CASES
+from fuzz_hull import run_differential
+from fuzz_hull import validate_hull
+from grid_hull import grid_hulls
+from hull_index import build_hull
+from hull3d import hull3d
+from hull3d import orient3d
+from incremental_hull import IncrementalHull
+from point_io import PointWriter
+from point_io import csv_to_points
+from point_io import iter_chunks
+from point_io import load_csv
+from point_io import load_points
+from point_io import save_csv
+from point_io import save_points
+
 
 class TestGivenFunctions(unittest.TestCase):
     """This class checks simple cases for the given functions."""
@@ -60,6 +102,69 @@ class TestGivenFunctions(unittest.TestCase):
         return
 
 
+class TestSortClockwise(unittest.TestCase):
+    """Checks the trig-free sort against the atan2 sort and its vectorized form."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-20, max_value=20),
+                st.integers(min_value=-20, max_value=20),
+            ),
+            min_size=8,
+            max_size=8,
+        )
+    )
+    def test_matches_atan2(self, points):
+        """Eight points keep the centroid exact, so atan2 ties are exact too"""
+        expected = list(points)
+        atan2_sort_clockwise(expected)
+        sort_clockwise(points)
+        self.assertEqual(points, expected)
+        return
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-(2**30), max_value=2**30),
+                st.integers(min_value=-(2**30), max_value=2**30),
+            ),
+            max_size=100,
+        ),
+        st.integers(min_value=1, max_value=2**30),
+    )
+    def test_vectorized(self, points, scale):
+        """Scaled copies of small grids make collinear ties at large coordinates"""
+        points += [(scale * (i % 3), scale * (i // 3 % 3)) for i in range(9)]
+        order = clockwise_order(np.array(points))
+        expected = list(points)
+        sort_clockwise(expected)
+        self.assertEqual([points[i] for i in order], expected)
+        return
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-(2**62), max_value=2**62),
+                st.integers(min_value=-(2**62), max_value=2**62),
+            ),
+            max_size=20,
+        ),
+        st.integers(min_value=1, max_value=2**40),
+    )
+    def test_exact(self, points, offset):
+        """Directions a hair apart at huge coordinates round to equal floats"""
+        points += [(2**61, 2**61 + i * offset) for i in range(3)]
+        n = len(points)
+        sum_x, sum_y = sum(x for x, _ in points), sum(y for _, y in points)
+        expected = sorted(points, key=lambda p: (
+            pseudo_angle(n * p[0] - sum_x, n * p[1] - sum_y, Fraction), p[0], p[1]
+        ))
+        sort_clockwise(points)
+        self.assertEqual(points, expected)
+        return
+
+
 def is_convex_hull(hull: List[Point], points: List[Point]):
     vertices = hull + [hull[0]]
     prev_two = deque(maxlen=2)
@@ -181,6 +286,731 @@ class TestComputeHull(unittest.TestCase):
         return
 
 
+class TestTangent(unittest.TestCase):
+    """Checks common tangents of the hulls of two halves of a sorted point set."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=20),
+                st.integers(min_value=0, max_value=20),
+            ),
+            min_size=2,
+            max_size=200,
+            unique=True,
+        ),
+        st.floats(min_value=0, max_value=1),
+    )
+    def test_tangent(self, points, split):
+        points = sorted(points)
+        middle = min(max(1, int(split * len(points))), len(points) - 1)
+        left, right = points[:middle], points[middle:]
+        for upper, outside in ((True, is_counter_clockwise), (False, is_clockwise)):
+            a, b = tangent(chan_hull(left), chan_hull(right), upper)
+            self.assertIn(a, left)
+            self.assertIn(b, right)
+            # Every point lies on the hull's side of the tangent, and the
+            # tangent's ends are its outermost points
+            for p in points:
+                self.assertFalse(outside(b, a, p))
+                if collinear(a, b, p):
+                    self.assertTrue(a <= p <= b)
+        return
+
+    def test_vertical(self):
+        """Halves that share an x coordinate"""
+        left = [(0, 0), (0, 5)]
+        right = [(0, 6), (0, 9), (3, 1)]
+        self.assertEqual(tangent(left, chan_hull(right), upper=True), ((0, 0), (0, 9)))
+        self.assertEqual(tangent(left, chan_hull(right), upper=False), ((0, 0), (3, 1)))
+        return
+
+
+class TestChanHull(unittest.TestCase):
+    """Checks the output-sensitive hull on the same inputs as compute_hull."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=100_000),
+                st.integers(min_value=0, max_value=100_000),
+            ),
+            min_size=1,
+            max_size=10_000,
+        )
+    )
+    def test_chan_hull(self, points):
+        hull = chan_hull(points)
+        self.assertTrue(is_convex_hull(hull, points))
+        self.assertEqual(hull, IncrementalHull(points).hull())
+        return
+
+    def test_empty(self):
+        self.assertEqual(chan_hull([]), [])
+        return
+
+    def test_hull_line(self):
+        """Collinear points leave only the two endpoints"""
+        points = [(i, i) for i in range(1000)]
+        self.assertEqual(chan_hull(points), [(0, 0), (999, 999)])
+        return
+
+    def test_many_hull_points(self):
+        """More hull vertices than the first group size forces a second guess"""
+        points = [(x, x * x) for x in range(-300, 300)]
+        hull = chan_hull(points)
+        self.assertEqual(len(hull), len(points))
+        self.assertTrue(is_convex_hull(hull, points))
+        return
+
+
+class TestIncrementalHull(unittest.TestCase):
+    """Checks the online hull against the same hull property as compute_hull."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=1_000),
+                st.integers(min_value=0, max_value=1_000),
+            ),
+            min_size=1,
+            max_size=1_000,
+        )
+    )
+    def test_insert(self, points):
+        stream = IncrementalHull()
+        for point in points:
+            stream.insert(point)
+            hull = stream.hull()
+            self.assertEqual(len(hull), len(stream))
+
+        self.assertTrue(set(hull) <= set(points))
+        self.assertTrue(is_convex_hull(hull, points))
+        return
+
+    def test_extend_from_generator(self):
+        """Bulk insertion accepts any iterator"""
+        points = [(i, i * i % 7) for i in range(50)]
+        stream = IncrementalHull(iter(points))
+        self.assertTrue(is_convex_hull(stream.hull(), points))
+        return
+
+    def test_interior_point_is_ignored(self):
+        stream = IncrementalHull([(0, 0), (4, 0), (4, 4), (0, 4)])
+        self.assertFalse(stream.insert((2, 2)))
+        self.assertTrue(stream.insert((2, 6)))
+        self.assertEqual(len(stream), 5)
+        return
+
+    def test_hull_is_clockwise(self):
+        stream = IncrementalHull([(1, 0), (0, 1), (0, 0), (1, 1)])
+        hull = stream.hull()
+        test_points = hull + hull[:2]
+        for i in range(len(hull)):
+            self.assertTrue(is_clockwise(*test_points[i : i + 3]))
+        return
+
+
+class TestDynamicHull(unittest.TestCase):
+    """Checks the dynamic hull against a hull rebuilt from scratch after every update."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.booleans(),  # delete (if possible) rather than insert
+                st.tuples(
+                    st.integers(min_value=0, max_value=20),
+                    st.integers(min_value=0, max_value=20),
+                ),
+            ),
+            max_size=200,
+        )
+    )
+    def test_insert_delete(self, operations):
+        dynamic = DynamicHull()
+        points = []
+        for delete, point in operations:
+            if delete and points:
+                point = points.pop(len(points) // 2)
+                dynamic.delete(point)
+            else:
+                points.append(point)
+                dynamic.insert(point)
+            self.assertEqual(dynamic.hull(), IncrementalHull(points).hull())
+        return
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=1_000),
+                st.integers(min_value=0, max_value=1_000),
+            ),
+            min_size=1,
+            max_size=500,
+        ),
+        st.tuples(
+            st.integers(min_value=-100, max_value=1_100),
+            st.integers(min_value=-100, max_value=1_100),
+        ),
+    )
+    def test_queries(self, points, query):
+        dynamic = DynamicHull(points)
+        hull = dynamic.hull()
+
+        dx, dy = query[0] - 500, query[1] - 500
+        if dx or dy:
+            extreme = dynamic.extreme((dx, dy))
+            best = max(dx * x + dy * y for x, y in points)
+            self.assertEqual(dx * extreme[0] + dy * extreme[1], best)
+
+        tangents = dynamic.tangents_from(query)
+        if dynamic.contains(query):
+            self.assertIsNone(tangents)
+        else:
+            u, v = tangents
+            self.assertIn(u, hull)
+            self.assertIn(v, hull)
+            for point in points:
+                self.assertFalse(is_counter_clockwise(query, u, point))
+                self.assertFalse(is_clockwise(query, v, point))
+        return
+
+    def test_delete_missing(self):
+        dynamic = DynamicHull([(0, 0)])
+        with self.assertRaises(KeyError):
+            dynamic.delete((1, 1))
+        return
+
+
+class TestHullIndex(unittest.TestCase):
+    """Checks hull queries against linear scans over the hull and the points."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=100),
+                st.integers(min_value=0, max_value=100),
+            ),
+            min_size=1,
+            max_size=300,
+        ),
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-10, max_value=110),
+                st.integers(min_value=-10, max_value=110),
+            ),
+            min_size=1,
+            max_size=50,
+        ),
+    )
+    def test_queries(self, points, queries):
+        hull = build_hull(points)
+        dynamic = DynamicHull(points)
+        self.assertTrue(is_convex_hull(hull.vertices, points))
+
+        directions = [(x - 50, y - 50) for x, y in queries if (x, y) != (50, 50)]
+        extremes = hull.extreme_many(np.array(directions).reshape(-1, 2))
+        for (dx, dy), extreme in zip(directions, extremes):
+            best = max(dx * x + dy * y for x, y in points)
+            self.assertEqual(dx * extreme[0] + dy * extreme[1], best)
+            scalar = hull.extreme((dx, dy))
+            self.assertEqual(dx * scalar[0] + dy * scalar[1], best)
+
+        contained = hull.contains_many(np.array(queries))
+        for query, inside in zip(queries, contained):
+            self.assertEqual(hull.contains(query), inside)
+            self.assertEqual(inside, dynamic.contains(query))
+
+            tangents = hull.tangents_from(query)
+            if inside:
+                self.assertIsNone(tangents)
+            else:
+                u, v = tangents
+                for point in points:
+                    self.assertFalse(is_counter_clockwise(query, u, point))
+                    self.assertFalse(is_clockwise(query, v, point))
+        return
+
+    def test_contains_square(self):
+        hull = build_hull([(0, 0), (2, 0), (2, 2), (0, 2), (1, 1)])
+        queries = np.array([(1, 1), (0, 1), (2, 2), (3, 1), (1, -1)])
+        self.assertEqual(
+            hull.contains_many(queries).tolist(), [True, True, True, False, False]
+        )
+        return
+
+    def test_bad_directions(self):
+        hull = build_hull([(0, 0), (2, 0), (2, 2), (0, 2)])
+        with self.assertRaises(ValueError):
+            hull.extreme_many(np.array([(1, 0), (0, 0), (0, -1)]))
+        with self.assertRaises(ValueError):
+            build_hull([]).extreme_many(np.array([(1, 0)]))
+        return
+
+
+def ragged(point_sets: List[List[Point]]):
+    """Packs point sets into the (offsets, coords) layout used by batch_hulls."""
+    offsets = np.cumsum([0] + [len(points) for points in point_sets])
+    coords = np.array([point for points in point_sets for point in points])
+    return offsets, coords.reshape(-1, 2)
+
+
+class TestBatchHull(unittest.TestCase):
+    """Checks every hull of a batch against chan_hull on the same point set."""
+
+    @given(
+        st.lists(
+            st.lists(
+                st.tuples(
+                    st.integers(min_value=0, max_value=50),
+                    st.integers(min_value=0, max_value=50),
+                ),
+                max_size=60,
+            ),
+            min_size=1,
+            max_size=30,
+        )
+    )
+    def test_batch_hulls(self, point_sets):
+        hull_offsets, hull_coords = batch_hulls(*ragged(point_sets))
+        self.assertEqual(len(hull_offsets), len(point_sets) + 1)
+        for i, points in enumerate(point_sets):
+            hull = hull_coords[hull_offsets[i] : hull_offsets[i + 1]]
+            self.assertEqual([tuple(p) for p in hull.tolist()], chan_hull(points))
+        return
+
+    def test_peel_cascade(self):
+        """A chain that exposes one reflex point at a time still peels fully"""
+        n = 3 * PEEL_ROUNDS
+        # A slightly concave run, then a point level with its start: each
+        # round of the upper chain can only remove the last point of the run
+        cascade = [(i << 16, -i * i) for i in range(n)] + [(n << 16, 0)]
+        xy = np.array(cascade + [(0, 0), (1, 5), (2, 0)])
+        segments = np.repeat([0, 1], [n + 1, 3])
+        upper = [0, n, n + 1, n + 2, n + 3]
+        self.assertEqual(peel_chain(xy, segments, -1).tolist(), upper)
+        lower = [0, n - 1, n, n + 1, n + 3]
+        self.assertEqual(peel_chain(xy, segments, 1).tolist(), lower)
+        return
+
+    @given(
+        st.lists(
+            st.lists(
+                st.tuples(
+                    st.integers(min_value=0, max_value=50),
+                    st.integers(min_value=0, max_value=50),
+                ),
+                max_size=60,
+            ),
+            min_size=1,
+            max_size=30,
+        )
+    )
+    def test_sequential_peel(self, point_sets):
+        """With no parallel rounds, the stack pass finds the same hulls"""
+        with mock.patch("batch_hull.PEEL_ROUNDS", 0):
+            hull_offsets, hull_coords = batch_hulls(*ragged(point_sets))
+        for i, points in enumerate(point_sets):
+            hull = hull_coords[hull_offsets[i] : hull_offsets[i + 1]]
+            self.assertEqual([tuple(p) for p in hull.tolist()], chan_hull(points))
+        return
+
+    def test_processes(self):
+        """Splitting the batch across processes gives the same result"""
+        point_sets = [
+            [(i * j % 17, (i + j) * j % 13) for i in range(j + 3)] for j in range(40)
+        ]
+        offsets, coords = ragged(point_sets)
+        serial = batch_hulls(offsets, coords)
+        parallel = batch_hulls(offsets, coords, processes=2)
+        self.assertTrue(np.array_equal(serial[0], parallel[0]))
+        self.assertTrue(np.array_equal(serial[1], parallel[1]))
+        return
+
+
+class TestPointIO(unittest.TestCase):
+    """Round-trips points through the binary and CSV formats."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.coords = np.random.default_rng(0).integers(-1000, 1000, (1000, 2))
+        return
+
+    def tearDown(self):
+        self.directory.cleanup()
+        return
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def test_binary_round_trip(self):
+        for dtype in (np.int32, np.int64, np.float64):
+            save_points(self.path("points.bin"), self.coords.astype(dtype))
+            for mmap in (True, False):
+                loaded = load_points(self.path("points.bin"), mmap=mmap)
+                self.assertEqual(loaded.dtype, dtype)
+                np.testing.assert_array_equal(loaded, self.coords)
+        return
+
+    def test_streamed_chunks(self):
+        with PointWriter(self.path("points.bin")) as writer:
+            for chunk in iter_chunks(self.coords, 300):
+                writer.write(chunk)
+        loaded = load_points(self.path("points.bin"))
+        self.assertIsInstance(loaded, np.memmap)
+        np.testing.assert_array_equal(loaded, self.coords)
+        self.assertEqual(
+            batch_hulls([0, len(loaded)], loaded)[1].tolist(),
+            [list(p) for p in chan_hull(list(map(tuple, self.coords.tolist())))],
+        )
+        return
+
+    def test_csv(self):
+        save_csv(self.path("points.csv"), self.coords)
+        np.testing.assert_array_equal(load_csv(self.path("points.csv")), self.coords)
+        count = csv_to_points(self.path("points.csv"), self.path("points.bin"))
+        self.assertEqual(count, len(self.coords))
+        np.testing.assert_array_equal(load_points(self.path("points.bin")), self.coords)
+        return
+
+    def test_empty(self):
+        save_points(self.path("points.bin"), [])
+        self.assertEqual(load_points(self.path("points.bin")).shape, (0, 2))
+        return
+
+
+class TestChunkedHull(unittest.TestCase):
+    """Checks the out-of-core hull against chan_hull on the whole input."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=1000),
+                st.integers(min_value=0, max_value=1000),
+            ),
+            max_size=500,
+        ),
+        st.integers(min_value=1, max_value=50),
+    )
+    def test_chunked_hull(self, points, chunk_size):
+        expected = chan_hull(points)
+        self.assertEqual(chunked_hull(iter(points), chunk_size), expected)
+        coords = np.array(points, dtype=np.int64).reshape(-1, 2)
+        self.assertEqual(chunked_hull(coords, chunk_size), expected)
+        return
+
+    def test_point_file(self):
+        coords = np.random.default_rng(1).integers(-10**6, 10**6, (10_000, 2))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "points.bin")
+            save_points(path, coords)
+            hull = chunked_hull(path, chunk_size=999)
+        self.assertEqual(hull, chan_hull(list(map(tuple, coords.tolist()))))
+        return
+
+
+class TestHull3D(unittest.TestCase):
+    """Checks the 3D hull's faces against every input point."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-5, max_value=5),
+                st.integers(min_value=-5, max_value=5),
+                st.integers(min_value=-5, max_value=5),
+            ),
+            min_size=4,
+            max_size=200,
+        )
+    )
+    def test_hull3d(self, points):
+        # hull3d rejects fewer than 4 distinct points and flat point sets
+        assume(len(set(points)) >= 4)
+        assume(np.linalg.matrix_rank(np.subtract(points, points[0])) == 3)
+        hull = hull3d(points)
+        vertices = [tuple(p) for p in hull.vertices.tolist()]
+        for a, b, c in hull.faces.tolist():
+            for point in points:
+                self.assertLessEqual(
+                    orient3d(vertices[a], vertices[b], vertices[c], point), 0
+                )
+        # Vertices are input points
+        for vertex in vertices:
+            self.assertIn(vertex, points)
+
+        # Half-edges pair up with their twins, and V - E + F = 2
+        twins = hull.twins
+        self.assertTrue((twins[twins] == np.arange(len(twins))).all())
+        faces = hull.faces.reshape(-1)
+        following = hull.faces[:, [1, 2, 0]].reshape(-1)
+        self.assertTrue((faces[twins] == following).all())
+        self.assertEqual(len(hull) - len(twins) // 2 + len(hull.faces), 2)
+        return
+
+    def test_cube(self):
+        corners = [(x, y, z) for x in (0, 2) for y in (0, 2) for z in (0, 2)]
+        hull = hull3d(corners + [(1, 1, 1), (1, 1, 2), (0, 0, 0)])
+        self.assertEqual(sorted(map(tuple, hull.vertices.tolist())), corners)
+        self.assertEqual(len(hull.faces), 12)
+        self.assertEqual(hull.volume(), 8)
+        self.assertTrue(hull.contains((1, 1, 2)))
+        self.assertFalse(hull.contains((1, 1, 3)))
+        return
+
+    def test_coplanar(self):
+        with self.assertRaises(ValueError):
+            hull3d([(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0)])
+        return
+
+    def test_face_point_first(self):
+        """Points inside a face or an edge are never vertices, in any order"""
+        corners = [(x, y, z) for x in (0, 2) for y in (0, 2) for z in (0, 2)]
+        for point in ((1, 1, 2), (1, 0, 2), (0, 1, 1), (1, 1, 1)):
+            for points in ([point] + corners, corners + [point]):
+                hull = hull3d(points)
+                self.assertEqual(sorted(map(tuple, hull.vertices.tolist())), corners)
+                self.assertEqual(len(hull.faces), 12)
+        return
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-2, max_value=2),
+                st.integers(min_value=-2, max_value=2),
+                st.integers(min_value=-2, max_value=2),
+            ),
+            min_size=4,
+            max_size=30,
+        )
+    )
+    def test_corners(self, points):
+        """On a small grid many points lie inside faces; none are vertices"""
+        assume(len(set(points)) >= 4)
+        assume(np.linalg.matrix_rank(np.subtract(points, points[0])) == 3)
+        vertices = [tuple(p) for p in hull3d(points).vertices.tolist()]
+        for vertex in vertices:
+            others = [p for p in points if p != vertex]
+            # Without a corner, the rest no longer reach it
+            if np.linalg.matrix_rank(np.subtract(others, others[0])) == 3:
+                self.assertFalse(hull3d(others).contains(vertex))
+        return
+
+
+def peel_layers(points: List[Point]) -> List[int]:
+    """Convex layers by computing and removing the hull repeatedly"""
+    remaining = list(points)
+    layers = {}
+    layer = 0
+    while remaining:
+        hull = set(chan_hull(remaining))
+        for point in hull:
+            layers[point] = layer
+        remaining = [point for point in remaining if point not in hull]
+        layer += 1
+    return [layers[point] for point in points]
+
+
+class TestConvexLayers(unittest.TestCase):
+    """Checks onion peeling against repeatedly hulling and removing."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=30),
+                st.integers(min_value=0, max_value=30),
+            ),
+            max_size=300,
+        )
+    )
+    def test_convex_layers(self, points):
+        self.assertEqual(convex_layers(points), peel_layers(points))
+        return
+
+    def test_core(self):
+        """Enough points to set a core aside"""
+        rng = np.random.default_rng(2)
+        points = list(map(tuple, rng.integers(0, 10**6, (6000, 2)).tolist()))
+        self.assertEqual(convex_layers(points), peel_layers(points))
+        return
+
+    def test_grid(self):
+        """Edge midpoints are not hull vertices, so they form the second layer"""
+        points = [(x, y) for x in range(3) for y in range(3)]
+        self.assertEqual(convex_layers(points), [0, 1, 0, 1, 2, 1, 0, 1, 0])
+        return
+
+
+def edge_extents(hull: List[Point], i: int):
+    """Extent of a hull along and across its edge i, by brute force."""
+    (ax, ay), (bx, by) = hull[i], hull[(i + 1) % len(hull)]
+    length = math.hypot(bx - ax, by - ay)
+    along = [((bx - ax) * x + (by - ay) * y) / length for x, y in hull]
+    across = [((bx - ax) * (y - ay) - (by - ay) * (x - ax)) / length for x, y in hull]
+    return max(along) - min(along), max(across)
+
+
+class TestCalipers(unittest.TestCase):
+    """Checks the rotating calipers against brute force over all edges and pairs."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-10**6, max_value=10**6),
+                st.integers(min_value=-10**6, max_value=10**6),
+            ),
+            min_size=3,
+            max_size=80,
+        )
+    )
+    def test_calipers(self, points):
+        hull = chan_hull(points)
+        if len(hull) < 3:
+            return
+        longest = max(math.dist(p, q) for p in hull for q in hull)
+        self.assertAlmostEqual(diameter(hull)[0], longest, delta=1e-6)
+        for p, q in farthest_pairs(hull):
+            self.assertAlmostEqual(math.dist(p, q), longest, delta=1e-6)
+
+        extents = [edge_extents(hull, i) for i in range(len(hull))]
+        narrowest = min(across for _, across in extents)
+        self.assertAlmostEqual(width(hull)[0], narrowest, delta=1e-6)
+        smallest = min(along * across for along, across in extents)
+        area, corners = min_area_rectangle(hull)
+        self.assertAlmostEqual(area, smallest, delta=1e-6 * max(1, smallest))
+        self.assertEqual(len(corners), 4)
+        return
+
+    @given(
+        st.lists(
+            st.lists(
+                st.tuples(
+                    st.integers(min_value=0, max_value=50),
+                    st.integers(min_value=0, max_value=50),
+                ),
+                max_size=40,
+            ),
+            min_size=1,
+            max_size=30,
+        )
+    )
+    def test_batch(self, point_sets):
+        offsets, coords = batch_hulls(*ragged(point_sets))
+        diameters, pairs = batch_diameters(offsets, coords)
+        widths = batch_widths(offsets, coords)
+        areas, corners = batch_min_area_rectangles(offsets, coords)
+        for i in range(len(point_sets)):
+            hull = list(map(tuple, coords[offsets[i] : offsets[i + 1]].tolist()))
+            if not hull:
+                self.assertEqual(diameters[i], 0)
+                continue
+            self.assertAlmostEqual(diameters[i], diameter(hull)[0])
+            self.assertAlmostEqual(math.dist(*pairs[i]), diameters[i])
+            self.assertAlmostEqual(widths[i], width(hull)[0])
+            self.assertAlmostEqual(areas[i], min_area_rectangle(hull)[0])
+            # Ties may pick a different rectangle, but never a different area
+            sides = np.diff(corners[i], axis=0)[:2]
+            self.assertAlmostEqual(np.prod(np.linalg.norm(sides, axis=1)), areas[i])
+            # Every hull vertex is within tolerance of the rectangle: clamp it
+            # into the (possibly degenerate) rectangle and measure the gap
+            origin = corners[i][0]
+            along, across = corners[i][1] - origin, corners[i][3] - origin
+            for p in hull:
+                offset = np.subtract(p, origin)
+                nearest = origin.copy()
+                for side in (along, across):
+                    length2 = side @ side
+                    if length2 > 0:
+                        nearest += side * min(max(offset @ side / length2, 0), 1)
+                self.assertLess(math.dist(p, nearest), 1e-6)
+        return
+
+    def test_square(self):
+        hull = [(0, 0), (2, 0), (2, 2), (0, 2)]
+        self.assertAlmostEqual(diameter(hull)[0], math.sqrt(8))
+        self.assertEqual(len(farthest_pairs(hull)), 2)
+        self.assertEqual(width(hull)[0], 2)
+        self.assertEqual(min_area_rectangle(hull), (4, [(0, 0), (2, 0), (2, 2), (0, 2)]))
+        return
+
+
+class TestDifferential(unittest.TestCase):
+    """Runs every hull engine on the same inputs and validates each hull."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=0, max_value=20),
+                st.integers(min_value=0, max_value=20),
+            ),
+            min_size=1,
+            max_size=200,
+        )
+    )
+    def test_engines_agree(self, points):
+        self.assertEqual(run_differential(np.array(points)), {})
+        return
+
+    def test_cases(self):
+        for name, case in CASES.items():
+            for n in (1, 3, 60, 2000):
+                coords = case(n, np.random.default_rng(n))
+                self.assertEqual(run_differential(coords), {}, (name, n))
+        return
+
+    def test_validator(self):
+        points = np.array([(0, 0), (4, 0), (4, 4), (0, 4), (2, 2), (2, 0)])
+        hull = [(0, 0), (4, 0), (4, 4), (0, 4)]
+        validate_hull(hull, points)
+        validate_hull([(0, 0), (2, 0)] + hull[1:], points, allow_collinear=True)
+        for bad in (
+            hull[::-1],  # counter-clockwise
+            hull[:-1],  # misses a point
+            hull + [(0, 0)],  # repeats a vertex
+            [(0, 0), (5, 0), (4, 4), (0, 4)],  # not an input point
+            [(0, 0), (2, 0)] + hull[1:],  # collinear vertex
+            [(0, 0), (4, 4), (4, 0), (0, 4)],  # self-intersecting
+        ):
+            with self.assertRaises(ValueError):
+                validate_hull(bad, points)
+        return
+
+
+class TestGridHulls(unittest.TestCase):
+    """Checks every cell hull, and the global hull, against chan_hull."""
+
+    @given(
+        st.lists(
+            st.tuples(
+                st.integers(min_value=-100, max_value=100),
+                st.integers(min_value=-100, max_value=100),
+            ),
+            max_size=300,
+        ),
+        st.integers(min_value=1, max_value=60),
+        st.integers(min_value=1, max_value=60),
+    )
+    def test_grid_hulls(self, points, width, height):
+        grid = grid_hulls(np.array(points, dtype=np.int64), (width, height))
+        cells = {}
+        for point in points:
+            cells.setdefault((point[0] // width, point[1] // height), []).append(point)
+        self.assertEqual(len(grid), len(cells))
+        for cell, members in cells.items():
+            self.assertEqual(grid.cell_of(members[0]), cell)
+            hull = list(map(tuple, grid.hull(cell).tolist()))
+            self.assertEqual(hull, chan_hull(members))
+        global_hull = list(map(tuple, grid.global_hull().tolist()))
+        self.assertEqual(global_hull, chan_hull(points))
+        return
+
+    def test_empty_cell(self):
+        grid = grid_hulls(np.array([(0, 0), (25, 5)]), 10, origin=(-5, -5))
+        self.assertEqual(grid.cells.tolist(), [[0, 0], [3, 1]])
+        with self.assertRaises(KeyError):
+            grid.hull((1, 0))
+        return
+
+
 if __name__ == "__main__":
     unittest.main()
     # test = TestComputeHull()
@@ -6,6 +6,10 @@ filename = argv[1]
 dp = argv[2] != "naive"
 
 image = ResizeableImage(filename)
-while image.width > 0:
-    seam = image.best_seam(dp=dp)
-    image.remove_best_seam()
+if dp:
+    stats = image.resize_to(0)
+    print('%(seams)d seams: %(setup).3fs setup, %(carving).3fs carving, '
+          '%(per_seam).4fs per seam' % stats)
+else:
+    while image.width > 0:
+        image.remove_seam(image.best_seam(dp=False))
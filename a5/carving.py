@@ -0,0 +1,268 @@
+from typing import Callable
+from typing import Optional
+
+import numpy as np
+
+import imagematrix
+
+# a pixel, represented in column-major order
+Pixel = tuple[int, int]
+# a list of coordinates, e.g. `[(5, 0), (5, 1), (4, 2), (5, 3), (6, 4)]`
+Path = list[Pixel]
+# a total cost paired with a specific path
+Seam = tuple[int, Path]
+# called with the number of seams removed so far and the number to remove
+Progress = Callable[[int, int], None]
+
+# Cost beyond either edge of a row, so that seams never leave the image
+OUTSIDE = np.iinfo(np.int64).max
+
+# Widest span of columns whose costs are updated in plain Python
+WINDOW = 32
+
+
+class CarvingSession:
+    """
+    Removes seams from an image one after another, keeping its energy map
+    and seam costs up to date between removals instead of recomputing them.
+
+    costs[row, col + 1] is the cost of the cheapest seam from (col, row) down
+    to the bottom row, as in ResizeableImage._best_seam_dynamic, with an
+    OUTSIDE column on either side. Walking down it gives the same best seam,
+    with the same ties, as best_seam().
+
+    Removing a seam only changes the energy of the pixels next to it: at
+    most four per row, between the seam's columns in the rows above and
+    below, less one. Costs are then recomputed from the bottom row up, in
+    each row only over those pixels and the ones above a changed cost. A
+    change that stops changing any cost stops there, so the work per seam is
+    close to O(height) rather than O(width * height).
+    """
+
+    def __init__(
+        self, image: imagematrix.ImageMatrix, energy: Optional[np.ndarray] = None
+    ):
+        """
+        Takes the image to carve and, optionally, its energy map if already
+        known, e.g. from a session on the transposed image.
+        """
+
+        self.image = image
+        self.energy = image.energy_map() if energy is None else energy.copy()
+        self.costs = np.full((image.height, image.width + 2), OUTSIDE)
+        self.costs[:, 1:-1] = self.energy
+        cheapest = np.empty(image.width, dtype=np.int64)
+        for row in range(image.height - 2, -1, -1):
+            below = self.costs[row + 1]
+            np.minimum(below[:-2], below[1:-1], out=cheapest)
+            np.minimum(cheapest, below[2:], out=cheapest)
+            self.costs[row, 1:-1] += cheapest
+
+    def _update(self, row: int, start: int, stop: int) -> np.ndarray:
+        """
+        Recomputes the costs of row from column start to stop from the row
+        below. Returns the array of columns whose cost changed.
+        """
+
+        below = self.costs[row + 1, start : stop + 2]
+        costs = self.energy[row, start:stop] + np.minimum(
+            np.minimum(below[:-2], below[1:-1]), below[2:]
+        )
+        current = self.costs[row, start + 1 : stop + 1]
+        differs = np.flatnonzero(costs != current)
+        current[...] = costs
+        return (start + differs).tolist()
+
+    def _update_window(self, row: int, start: int, stop: int) -> list:
+        """
+        _update() for a few columns, where plain Python beats NumPy's
+        per-call overhead.
+        """
+
+        if stop - start > WINDOW:
+            return self._update(row, start, stop)
+        below = self.costs[row + 1, start : stop + 2].tolist()
+        energy = self.energy[row, start:stop].tolist()
+        current = self.costs[row, start + 1 : stop + 1].tolist()
+        changed = []
+        for k, e in enumerate(energy):
+            cost = e + min(below[k], below[k + 1], below[k + 2])
+            if cost != current[k]:
+                current[k] = cost
+                changed.append(start + k)
+        if changed:
+            self.costs[row, start + 1 : stop + 1] = current
+        return changed
+
+    def best_cost(self) -> int:
+        """
+        The total energy of the seam best_seam() would return.
+        """
+
+        return int(self.costs[0].min())
+
+    def best_seam(self) -> Path:
+        """
+        The seam best_seam() would return for the current image.
+        """
+
+        col = int(np.argmin(self.costs[0])) - 1
+        path = [(col, 0)]
+        for row in range(1, self.image.height):
+            col += int(np.argmin(self.costs[row, col : col + 3])) - 1
+            path.append((col, row))
+        return path
+
+    def remove_best_seam(self) -> Path:
+        """
+        Removes the best seam from the image, and returns it.
+        """
+
+        seam = self.best_seam()
+        self.remove_seam(seam)
+        return seam
+
+    def remove_seam(self, seam: Path):
+        """
+        Removes a seam from the image, and updates the energy map and the
+        seam costs to match.
+        """
+
+        self.image.remove_seam(seam)
+        height, width = self.image.height, self.image.width
+        columns = [0] * height
+        for col, row in seam:
+            columns[row] = col
+        if width == 0:
+            self.energy = self.energy[:, :0]
+            return
+
+        # Pixels whose neighbours changed, in the columns after removal
+        around = np.array(columns[:1] + columns + columns[-1:])
+        lowest = np.minimum(np.minimum(around[:-2], around[1:-1]), around[2:])
+        highest = np.maximum(np.maximum(around[:-2], around[1:-1]), around[2:])
+        starts = np.clip(lowest - 1, 0, width - 1)
+        stops = np.clip(highest + 1, 1, width).tolist()
+        cols = np.minimum(starts[:, None] + np.arange(4), width - 1)
+        energies = self.image.energies(cols, np.arange(height)[:, None])
+        starts = starts.tolist()
+
+        # Both arrays shrink in place: each row slides left over the seam
+        energy, costs = self.energy, self.costs
+        changed = None
+        for row in range(height - 1, -1, -1):
+            col = columns[row]
+            energy[row, col:width] = energy[row, col + 1 : width + 1]
+            costs[row, col + 1 : width + 2] = costs[row, col + 2 : width + 3]
+            energy[row, cols[row]] = energies[row]
+
+            start, stop = starts[row], stops[row]
+            if row == height - 1:
+                costs[row, start + 1 : stop + 1] = energy[row, start:stop]
+                changed = range(start, stop)
+                continue
+            # Pixels above a changed cost may change too
+            if len(changed):
+                start = max(min(start, changed[0] - 1), 0)
+                stop = min(max(stop, changed[-1] + 2), width)
+            changed = self._update_window(row, start, stop)
+        self.energy = energy[:, :width]
+        self.costs = costs[:, : width + 2]
+
+
+def seam_order(
+    image: imagematrix.ImageMatrix, count: int, progress: Optional[Progress] = None
+) -> np.ndarray:
+    """
+    Carves the best `count` seams out of a copy of image, one after another
+    as remove_best_seam() would, and returns a (height, width) map of the
+    step at which each pixel of the original image was removed, or -1 for
+    the pixels still left. Calls `progress` after every seam.
+
+    The original column of every remaining pixel is carried along in an
+    array shifted just like the pixels, so each seam is mapped back to the
+    original image as it is removed.
+    """
+
+    height, width = image.height, image.width
+    if not 0 <= count <= width:
+        raise ValueError('cannot remove %d seams from an image %d wide' % (count, width))
+    session = CarvingSession(image._from_pixels(image.pixels.copy()))
+    order = np.full((height, width), -1, dtype=np.int64)
+    original = np.tile(np.arange(width), (height, 1))
+    rows = np.arange(height)
+    for step in range(count):
+        # best_seam() lists one pixel per row, from the top down
+        columns = np.array([col for col, _ in session.remove_best_seam()])
+        order[rows, original[rows, columns]] = step
+        original = imagematrix.remove_columns(original, columns)
+        if progress is not None:
+            progress(step + 1, count)
+    return order
+
+
+class SeamIndex:
+    """
+    An image together with the step at which carving it down seam by seam
+    would remove each of its pixels, so it can be shown at any width
+    without searching for seams again.
+
+    order[row, col] is that step, stored as uint16 when the image is
+    narrower than 65536 pixels and uint32 otherwise. The pixels left at a
+    given width are those removed at a later step, exactly width of them
+    per row, so rendering takes one vectorized mask.
+    """
+
+    def __init__(self, pixels: np.ndarray, order: np.ndarray):
+        self.pixels = pixels
+        self.order = order
+
+    @classmethod
+    def build(
+        cls, image: imagematrix.ImageMatrix, progress: Optional[Progress] = None
+    ) -> 'SeamIndex':
+        """
+        Carves a copy of image all the way down, recording every seam.
+        """
+
+        order = seam_order(image, image.width, progress)
+        dtype = np.uint16 if image.width <= np.iinfo(np.uint16).max else np.uint32
+        return cls(image.pixels.copy(), order.astype(dtype))
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def render(self, width: int) -> np.ndarray:
+        """
+        The (height, width, 3) pixels of the image carved down to width,
+        the same as remove_best_seam() would leave.
+        """
+
+        if not 0 <= width <= self.width:
+            raise ValueError('cannot render an image %d wide at %d' % (self.width, width))
+        keep = self.order >= self.width - width
+        return self.pixels[keep].reshape(self.height, width, 3)
+
+    def image(self, width: int) -> imagematrix.ImageMatrix:
+        """
+        The image carved down to width, as an ImageMatrix.
+        """
+
+        return imagematrix.ImageMatrix._from_pixels(self.render(width))
+
+    def save(self, filename: str):
+        """
+        Saves the pixels and their order together, as a .npz file.
+        """
+
+        np.savez(filename, pixels=self.pixels, order=self.order)
+
+    @classmethod
+    def load(cls, filename: str) -> 'SeamIndex':
+        with np.load(filename) as data:
+            return cls(data['pixels'], data['order'])
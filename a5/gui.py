@@ -3,14 +3,16 @@ import os
 from tkinter import *
 from tkinter import ttk
 from tkinter.filedialog import askopenfilename
+from carving import SeamIndex
 from resizeable_image import ResizeableImage
 
 seam = None
 image = None
+index = None
 temp='_gtemp_.ppm'
 
 def open_file():
-    global image, status
+    global image, index, status
     filename = askopenfilename()
     if filename is None: return
     status['text'] = 'Loading %s...' % os.path.basename(filename)
@@ -20,6 +22,7 @@ def open_file():
     except:
         status['text'] = 'Error loading %s!' % os.path.basename(filename)
         raise
+    index = None
     update_display()
     seam = None
     status['text'] = 'Loaded %s.  Now compute or remove seam.' % \
@@ -72,25 +75,28 @@ def show_seam():
     status['text'] = 'Computed seam, as shown in red.'
 
 def remove_seam():
-    global image, seam
+    global image, index, seam
     if image is None: return
+    index = None
+    try:
+        repeat = max(int(multiple_spin.get()), 1)
+    except ValueError:
+        repeat = 1
     count = 0
-    while True:
-        compute_seam(count)
+    if seam is not None:
+        # Remove the seam already shown first
         image.remove_seam(seam)
-        update_display()
         seam = None
-        count += 1
-
-        try:
-            repeat = int(multiple_spin.get())
-        except ValueError:
-            break
-        if repeat <= 1: break
-        repeat -= 1
+        count = 1
+    def progress(done, total):
+        update_display()
         multiple_spin.delete(0,'end')
-        multiple_spin.insert(0,repeat)
+        multiple_spin.insert(0,max(total-done,1))
         multiple_spin.update()
+        status['text'] = 'Removed seam %d...' % (count+done)
+        status.update()
+    count += image.remove_seams(min(repeat-count, image.width), progress)['seams']
+    update_display()
     multiple_spin.delete(0,'end')
     multiple_spin.insert(0,1)
     if count > 1:
@@ -98,6 +104,29 @@ def remove_seam():
     else:
         status['text'] = 'Removed seam.'
 
+def index_seams():
+    global image, index, seam
+    if image is None: return
+    def progress(done, total):
+        if done % 10 == 0 or done == total:
+            status['text'] = 'Indexing seam %d of %d...' % (done, total)
+            status.update()
+    index = SeamIndex.build(image, progress)
+    seam = None
+    width_scale['to'] = index.width
+    width_scale.set(index.width)
+    status['text'] = 'Indexed %d seams.  Drag to resize.' % index.width
+
+def resize_from_index(value):
+    global image, seam
+    if index is None: return
+    width = max(int(float(value)), 1)
+    if width == image.width: return
+    image = ResizeableImage._from_pixels(index.render(width))
+    seam = None
+    update_display()
+    status['text'] = 'Resized to %d pixels wide.' % width
+
 root = Tk()
 root.title('Seam Carving')
 status = Label(text='Please open an image.')
@@ -114,6 +143,10 @@ multiple_spin = Spinbox(multiple_frame,
     width=3, from_=1, to_=100, increment=1)
 multiple_spin.pack(side='right')
 multiple_frame.pack(side='top', fill='x')
+index_button = ttk.Button(buttons, text='Index Seams', command=index_seams).pack()
+width_scale = Scale(buttons, label='Width:', orient='horizontal',
+    from_=1, to=1, command=resize_from_index)
+width_scale.pack(side='top', fill='x')
 buttons.pack(side='left')
 display = Label(root)
 display.pack(side='top')
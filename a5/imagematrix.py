@@ -1,6 +1,9 @@
 import os
-import struct
 import sys
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+
+import numpy as np
 
 try:
     from PIL import Image
@@ -11,50 +14,156 @@ except:
 class SeamError(Exception):
     pass
 
-class ImageMatrix(dict):
+def remove_columns(array, columns):
+    """Takes an array with at least two dimensions and the column to remove
+    from each of its rows. Slides the rest of each row left over it in
+    place, one memmove per row, and returns the array narrowed by one
+    column as a view of the same buffer."""
+    width = array.shape[1]
+    for row, col in enumerate(np.asarray(columns).tolist()):
+        array[row, col:width-1] = array[row, col+1:width]
+    return array[:, :width-1]
+
+# The pairs of neighbours, as (di, dj) offsets, whose color distances sum
+# to the energy() of an interior pixel: left and right, above and below,
+# and the two diagonals
+NEIGHBOUR_PAIRS = (((-1, 0), (1, 0)), ((0, -1), (0, 1)),
+                   ((-1, -1), (1, 1)), ((1, -1), (-1, 1)))
+
+def _interior_energy(pixels):
+    """Takes an (height, width, 3) array of pixels. Returns the energy() of
+    all but its edge pixels, as a (height-2, width-2) int16 array."""
+    # One contiguous plane per channel. The largest energy, 4 * 3 * 255,
+    # fits in int16, so the sums never need a wider type
+    planes = np.ascontiguousarray(pixels.transpose(2, 0, 1), np.int16)
+    def shifted(plane, di, dj):
+        """The neighbours at offset (di, dj) of every interior pixel."""
+        return plane[1+dj:dj-1 or None, 1+di:di-1 or None]
+    height, width = pixels.shape[:2]
+    total = np.zeros((height - 2, width - 2), dtype=np.int16)
+    difference = np.empty_like(total)
+    for plane in planes:
+        for a, b in NEIGHBOUR_PAIRS:
+            np.subtract(shifted(plane, *a), shifted(plane, *b), out=difference)
+            np.abs(difference, out=difference)
+            total += difference
+    return total
+
+def _energy_band(task):
+    """Computes rows start to stop of an energy map in shared memory, for
+    ImageMatrix.energy_map(), from the pixel rows one beyond them on
+    either side."""
+    pixels_name, energy_name, shape, start, stop = task
+    pixels_memory = shared_memory.SharedMemory(name=pixels_name)
+    energy_memory = shared_memory.SharedMemory(name=energy_name)
+    pixels = np.ndarray(shape + (3,), np.uint8, pixels_memory.buf)
+    energy = np.ndarray(shape, np.int64, energy_memory.buf)
+    energy[start:stop, 1:-1] = _interior_energy(pixels[start-1:stop+1])
+    del pixels, energy
+    pixels_memory.close()
+    energy_memory.close()
+
+class ImageMatrix:
     def __init__(self, image):
         """Takes either a PIL image, or a filename of an image. Stores
-        pixels in its dictionary, and also stores width and height."""
+        pixels in an (height, width, 3) array of RGB values, so pixel
+        (i,j) is self.pixels[j,i]."""
         if not isinstance(image, Image.Image):
             image = Image.open(image)
-        self.width, self.height = image.size
-        pixels = iter(image.getdata())
-        for j in range(self.height):
-            for i in range(self.width):
-                self[i,j] = next(pixels)
+        # A single copy out of PIL's buffer; np.asarray alone is read-only
+        self.pixels = np.array(image.convert('RGB'))
+
+    @classmethod
+    def _from_pixels(cls, pixels):
+        """An image of this class holding the given (height, width, 3)
+        array as its pixels, without copying it."""
+        image = cls.__new__(cls)
+        image.pixels = pixels
+        return image
+
+    def transposed(self):
+        """Returns a view of self with rows and columns swapped, sharing
+        its pixels, so pixel (i,j) of the view is pixel (j,i) of self.
+        Energies are symmetric, so energy(i,j) of the view is energy(j,i)
+        of self, and a vertical seam of the view is a horizontal seam of
+        self."""
+        return self._from_pixels(self.pixels.transpose(1, 0, 2))
+
+    def copy(self):
+        """Returns an independent copy of self."""
+        return self._from_pixels(self.pixels.copy())
+
+    @property
+    def width(self):
+        return self.pixels.shape[1]
+
+    @property
+    def height(self):
+        return self.pixels.shape[0]
+
+    def _check(self, coords):
+        """Raises KeyError for coordinates outside the image, as the dict
+        of pixels this class used to keep did, instead of letting numpy
+        wrap negative ones around to the far edge."""
+        i, j = coords
+        if not (0 <= i < self.width and 0 <= j < self.height):
+            raise KeyError(coords)
+        return i, j
+
+    def __getitem__(self, coords):
+        i, j = self._check(coords)
+        return tuple(self.pixels[j, i].tolist())
+
+    def __setitem__(self, coords, color):
+        i, j = self._check(coords)
+        self.pixels[j, i] = color[:3]
+
+    def _seam_columns(self, seam):
+        """Takes a seam (a list of coordinates with exactly one pair of
+        coordinates per row). Returns the array of its column in each row.
+        Checks every pair at once, but reports the same error as checking
+        them one by one would."""
+        seam = np.asarray(seam, dtype=np.int64).reshape(-1, 2)
+        i, j = seam[:, 0], seam[:, 1]
+        bad_row = (j < 0) | (j >= self.height)
+        # Every pair after the first one in the same row repeats it
+        _, first = np.unique(np.where(bad_row, -1, j), return_index=True)
+        repeated = np.ones(len(seam), dtype=bool)
+        repeated[first] = False
+        repeated &= ~bad_row
+        bad_column = (i < 0) | (i >= self.width)
+        errors = np.flatnonzero(bad_row | repeated | bad_column)
+        if len(errors):
+            k = errors[0]
+            if bad_row[k]:
+                raise SeamError('seam has nonexistent row %d' % j[k])
+            if repeated[k]:
+                raise SeamError('seam has repeated row %d' % j[k])
+            raise SeamError('seam has nonexistent column %d' % i[k])
+        columns = np.full(self.height, -1)
+        columns[j] = i
+        missed = np.flatnonzero(columns < 0)
+        if len(missed):
+            raise SeamError('seam missed rows %s' % ','.join(map(str,missed)))
+        return columns
 
     def color_seam(self, seam, color=(255,0,0)):
         """Takes a seam (a list of coordinates) and colors it all one
         color."""
-        for i,j in seam:
-            self[i,j] = color
+        if len(seam):
+            columns, rows = np.asarray(seam).T
+            self.pixels[rows, columns] = color[:3]
 
     def remove_seam(self, seam):
         """Takes a seam (a list of coordinates with exactly one pair of
         coordinates per row). Removes pixel at each of those coordinates,
         and slides left all the pixels to its right. Decreases the width
-        by 1."""
-        seen = [False for j in range(self.height)]
-        for i,j in seam:
-            if not (0 <= j < self.height):
-                raise SeamError('seam has nonexistent row %d' % i)
-            if seen[j]:
-                raise SeamError('seam has repeated row %d' % i)
-            seen[j] = True
-            for ii in range(i, self.width-1):
-                self[ii,j] = self[ii+1,j]
-            del self[self.width-1,j]
-        missed = [j for j in range(self.height) if not seen[j]]
-        if missed:
-            raise SeamError('seam missed rows %s' % ','.join(map(str,missed)))
-        self.width -= 1
+        by 1. Done in place, by remove_columns()."""
+        self.pixels = remove_columns(self.pixels, self._seam_columns(seam))
 
     def image(self):
         """Returns a PIL Image that is represented by self."""
-        image = Image.new('RGB', (self.width, self.height))
-        image.putdata(
-            [self[i,j] for j in range(self.height) for i in range(self.width)])
-        return image
+        return Image.fromarray(np.ascontiguousarray(self.pixels))
 
     def save(self,*args,**keyw):
         self.image().save(*args,**keyw)
@@ -62,8 +171,7 @@ class ImageMatrix(dict):
     def ppm(self):
         """Returns self in (binary) ppm form."""
         return b'P6 %d %d 255\n' % (self.width, self.height) + \
-            b''.join ([struct.pack('BBB', *self[i,j][:3])
-                      for j in range(self.height) for i in range(self.width)])
+            np.ascontiguousarray(self.pixels).tobytes()
 
     def save_ppm(self, filename):
         """Saves self as a .ppm"""
@@ -101,6 +209,60 @@ class ImageMatrix(dict):
                    self.distance(self[i-1,j-1], self[i+1,j+1]) +\
                    self.distance(self[i+1,j-1], self[i-1,j+1])
 
+    def energy_map(self, processes=None):
+        """Returns the energies of all pixels as a (height, width) array,
+        so energy(i,j) is energy_map()[j,i]. Computed for the whole image at
+        once, with the same formula and border value as energy().
+
+        Given a number of processes, the rows are split into bands computed
+        by a process pool. The pixels are copied once into shared memory,
+        each process reads its band with a row of halo above and below, and
+        writes its energies straight into a shared result array."""
+        energy = np.full((self.height, self.width), 10000, dtype=np.int64)
+        if self.width <= 2 or self.height <= 2:
+            return energy
+        if not processes or processes <= 1 or self.height < 64 * processes:
+            energy[1:-1, 1:-1] = _interior_energy(self.pixels)
+            return energy
+
+        shape = (self.height, self.width)
+        pixels_memory = shared_memory.SharedMemory(create=True, size=self.pixels.size)
+        energy_memory = shared_memory.SharedMemory(create=True, size=energy.nbytes)
+        try:
+            shared_pixels = np.ndarray(shape + (3,), np.uint8, pixels_memory.buf)
+            shared_pixels[...] = self.pixels
+            shared_energy = np.ndarray(shape, np.int64, energy_memory.buf)
+            shared_energy[...] = energy
+            # A few bands per process balances their start-up times
+            bounds = np.linspace(1, self.height-1, 4*processes + 1).astype(int)
+            tasks = [(pixels_memory.name, energy_memory.name, shape, start, stop)
+                     for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+            with Pool(processes) as pool:
+                pool.map(_energy_band, tasks)
+            energy[...] = shared_energy
+            del shared_pixels, shared_energy
+        finally:
+            for memory in (pixels_memory, energy_memory):
+                memory.close()
+                memory.unlink()
+        return energy
+
+    def energies(self, cols, rows):
+        """Returns the energy() of many pixels at once, given the arrays
+        of their column and row indices."""
+        cols, rows = np.broadcast_arrays(np.asarray(cols), np.asarray(rows))
+        energy = np.full(cols.shape, 10000, dtype=np.int64)
+        inside = (cols > 0) & (rows > 0) & \
+            (cols < self.width-1) & (rows < self.height-1)
+        i, j = cols[inside], rows[inside]
+        def distances(a, b):
+            (diA, djA), (diB, djB) = a, b
+            pixelsA = self.pixels[j+djA, i+diA].astype(np.int16)
+            pixelsB = self.pixels[j+djB, i+diB].astype(np.int16)
+            return np.abs(pixelsA - pixelsB).sum(axis=-1)
+        energy[inside] = sum(distances(a, b) for a, b in NEIGHBOUR_PAIRS)
+        return energy
+
     def distance(self, pixelA, pixelB):
         """A distance metric between two pixels, based on their colors."""
         ans = 0
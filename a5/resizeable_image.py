@@ -1,15 +1,19 @@
-import imagematrix
+import time
+from typing import Optional
+
+import numpy as np
 
-# a pixel, represented in column-major order
-Pixel = tuple[int, int]
-# a list of coordinates, e.g. `[(5, 0), (5, 1), (4, 2), (5, 3), (6, 4)]`
-Path = list[Pixel]
-# a total cost paired with a specific path
-Seam = tuple[int, Path]
+import imagematrix
+from carving import CarvingSession
+from carving import Path
+from carving import Pixel
+from carving import Progress
+from carving import Seam
+from carving import seam_order
 
 
 class ResizeableImage(imagematrix.ImageMatrix):
-    _energy_cache: list[list[int | None]]
+    _energy_cache: np.ndarray
     _seams: list[Seam]
 
     def best_seam(self, dp=True) -> Path:
@@ -19,10 +23,8 @@ class ResizeableImage(imagematrix.ImageMatrix):
         if removed.
         """
 
-        # Memoized cache of energy values
-        self._energy_cache = [
-            [None for _ in range(self.height)] for _ in range(self.width)
-        ]
+        # Energy of every pixel, computed in one pass
+        self._energy_cache = self.energy_map()
 
         if dp:
             return self._best_seam_dynamic()
@@ -42,6 +44,219 @@ class ResizeableImage(imagematrix.ImageMatrix):
     def remove_best_seam(self):
         self.remove_seam(self.best_seam())
 
+    def remove_seams(self, count: int, progress: Optional[Progress] = None) -> dict:
+        """
+        Remove the `count` best seams one after another, each the one
+        remove_best_seam() would remove at that point, calling `progress`
+        after every seam.
+
+        The energy map and seam costs are built once and then only updated
+        around each removed seam (see carving.CarvingSession), rather than
+        recomputed for every seam. Returns timing stats, in seconds: `setup`
+        for building them, `carving` for removing the seams, and `per_seam`.
+        """
+
+        if not 0 <= count <= self.width:
+            raise ValueError(
+                'cannot remove %d seams from an image %d wide' % (count, self.width)
+            )
+        start = time.perf_counter()
+        session = CarvingSession(self)
+        setup = time.perf_counter() - start
+        for done in range(1, count + 1):
+            session.remove_best_seam()
+            if progress is not None:
+                progress(done, count)
+        carving = time.perf_counter() - start - setup
+        return {
+            'seams': count,
+            'setup': setup,
+            'carving': carving,
+            'per_seam': carving / count if count else 0.0,
+        }
+
+    def resize_to(self, width: int, progress: Optional[Progress] = None) -> dict:
+        """
+        Narrow the image to `width` columns by removing its best seams, as
+        remove_seams() does. Returns the same timing stats.
+        """
+
+        return self.remove_seams(self.width - width, progress)
+
+    def enlarge_to(self, width: int) -> dict:
+        """
+        Widen the image to `width` columns by inserting seams: the seams
+        that removing as many would take out are each duplicated, the copy
+        colored the average of the seam pixel and its right neighbour.
+
+        The seams are found together by carving.seam_order(), and inserted
+        with one vectorized repeat. Widening by more than the current width
+        takes several rounds, each at most doubling the width. Returns the
+        number of seams inserted and the time taken.
+        """
+
+        if width < self.width or (width > self.width and self.width == 0):
+            raise ValueError('cannot enlarge an image %d wide to %d' % (self.width, width))
+        start = time.perf_counter()
+        inserted = width - self.width
+        while self.width < width:
+            chosen = seam_order(self, min(width - self.width, self.width)) >= 0
+            right = np.concatenate([self.pixels[:, 1:], self.pixels[:, -1:]], axis=1)
+            average = (self.pixels.astype(np.uint16) + right) // 2
+            # Every chosen pixel is followed by its copy, in one flat repeat
+            repeats = 1 + chosen.ravel()
+            pixels = np.repeat(self.pixels.reshape(-1, 3), repeats, axis=0)
+            copies = np.cumsum(repeats)[chosen.ravel()] - 1
+            pixels[copies] = average.reshape(-1, 3)[chosen.ravel()]
+            self.pixels = pixels.reshape(self.height, -1, 3)
+        return {'seams': inserted, 'seconds': time.perf_counter() - start}
+
+    def best_horizontal_seam(self) -> Path:
+        """
+        Calculate the best seam running from the left edge of the image to
+        the right, with one pixel in every column: the best vertical seam of
+        the transposed image, read back in this image's coordinates.
+        """
+
+        return [(col, row) for row, col in self.transposed().best_seam()]
+
+    def remove_horizontal_seam(self, seam: Path):
+        """
+        Remove a seam with one pixel in every column, sliding up the pixels
+        below it. Decreases the height by 1.
+        """
+
+        view = self.transposed()
+        view.remove_seam([(row, col) for col, row in seam])
+        self.pixels = view.pixels.transpose(1, 0, 2)
+
+    def remove_best_horizontal_seam(self):
+        self.remove_horizontal_seam(self.best_horizontal_seam())
+
+    def retarget(self, width: int, height: int, order: str = 'greedy') -> dict:
+        """
+        Shrink the image to `width` by `height` by removing both vertical
+        and horizontal seams, choosing which kind to remove at each step.
+
+        - 'greedy' removes whichever of the two best seams costs less, every
+          time. Each kind keeps its own CarvingSession, updated around the
+          seams it removes and rebuilt after the other kind removes one.
+        - 'optimal' fills the transport map of Avidan and Shamir's paper:
+          T(r, c), the cheapest total cost of r horizontal and c vertical
+          removals, is the cheaper of T(r-1, c) plus the best horizontal
+          seam of that cell's image and T(r, c-1) plus the best vertical
+          one. Each cell keeps only the image its choice leads to, so this
+          is the paper's approximation: another order may reach a different
+          image, and cost less. The order is read back from the choices.
+          Each cell builds one CarvingSession for its horizontal seam, from
+          the energy map kept with its image; the vertical session is
+          carried along a row for as long as the map keeps going left.
+
+        Returns the seam counts, the order in which they were removed (as a
+        string of 'v' and 'h'), their total energy, and the time taken.
+        """
+
+        if not (0 < width <= self.width and 0 < height <= self.height):
+            raise ValueError('cannot retarget a %dx%d image to %dx%d' % (
+                self.width, self.height, width, height))
+        start = time.perf_counter()
+        if order == 'greedy':
+            steps, cost = self._retarget_greedy(width, height)
+        elif order == 'optimal':
+            steps, cost = self._retarget_optimal(width, height)
+        else:
+            raise ValueError('unknown seam order %r' % order)
+        return {
+            'vertical': steps.count('v'),
+            'horizontal': steps.count('h'),
+            'order': steps,
+            'cost': cost,
+            'seconds': time.perf_counter() - start,
+        }
+
+    def _retarget_greedy(self, width: int, height: int) -> tuple[str, int]:
+        steps, total = [], 0
+        vertical = horizontal = None
+        while self.width > width or self.height > height:
+            # Whichever session is still current knows the energy map
+            if self.width > width and vertical is None:
+                energy = horizontal.energy.T if horizontal else None
+                vertical = CarvingSession(self, energy)
+            if self.height > height and horizontal is None:
+                energy = vertical.energy.T if vertical else None
+                horizontal = CarvingSession(self.transposed(), energy)
+            if self.height == height or (
+                self.width > width
+                and vertical.best_cost() <= horizontal.best_cost()
+            ):
+                total += vertical.best_cost()
+                vertical.remove_best_seam()
+                steps.append('v')
+                horizontal = None
+            else:
+                total += horizontal.best_cost()
+                horizontal.remove_best_seam()
+                self.pixels = horizontal.image.pixels.transpose(1, 0, 2)
+                steps.append('h')
+                vertical = None
+        return ''.join(steps), total
+
+    def _retarget_optimal(self, width: int, height: int) -> tuple[str, int]:
+        rows, cols = self.height - height, self.width - width
+        # One row of the map at a time: images[c], energies[c] and costs[c]
+        # are for c vertical and r horizontal removals once cell (r, c) is
+        # done. Energies fit in int16 (see imagematrix._interior_energy),
+        # which keeps a whole row of them affordable for large images.
+        images = [self.copy()]
+        energies = [self.energy_map().astype(np.int16)]
+        costs = [0]
+        moves = [['']]
+        # A session on the image to the left of the current cell, if
+        # carving one vertical seam from it is still the current state
+        vertical = CarvingSession(images[0].copy(), energies[0])
+        for c in range(1, cols + 1):
+            costs.append(costs[-1] + vertical.best_cost())
+            vertical.remove_best_seam()
+            images.append(vertical.image.copy())
+            energies.append(vertical.energy.astype(np.int16))
+            moves[0].append('v')
+
+        for r in range(1, rows + 1):
+            moves.append([])
+            vertical = None
+            for c in range(cols + 1):
+                horizontal = CarvingSession(images[c].transposed(), energies[c].T)
+                above = costs[c] + horizontal.best_cost()
+                if c > 0:
+                    if vertical is None:
+                        vertical = CarvingSession(images[c - 1].copy(), energies[c - 1])
+                    left = costs[c - 1] + vertical.best_cost()
+                if c > 0 and left <= above:
+                    vertical.remove_best_seam()
+                    images[c] = vertical.image.copy()
+                    energies[c] = vertical.energy.astype(np.int16)
+                    costs[c] = left
+                    moves[r].append('v')
+                else:
+                    horizontal.remove_best_seam()
+                    images[c] = self._from_pixels(
+                        horizontal.image.pixels.transpose(1, 0, 2))
+                    energies[c] = horizontal.energy.T.astype(np.int16)
+                    costs[c] = above
+                    moves[r].append('h')
+                    vertical = None
+
+        steps = []
+        r, c = rows, cols
+        while r or c:
+            steps.append(moves[r][c])
+            if moves[r][c] == 'v':
+                c -= 1
+            else:
+                r -= 1
+        self.pixels = images[cols].pixels
+        return ''.join(reversed(steps)), costs[cols]
+
     def _best_seam_recursive(self, pixel, seam):
         """
         Recursive algorithm for calculating the best seam.
@@ -73,57 +288,45 @@ class ResizeableImage(imagematrix.ImageMatrix):
     def _best_seam_dynamic(self):
         """
         Dynamic programming algorithm for calculating the best seam.
+
+        The table is filled from the bottom row up: cost[col] is the cost of
+        the cheapest seam from (col, row) down to the bottom, and moves[row]
+        holds the column offset (-1, 0 or 1) it takes into the next row. Each
+        row is computed at once from the row below it. Ties go to the
+        leftmost column at every step, so the seam returned is the cheapest
+        one with the lowest columns from the top row down.
         """
 
-        # Initialize DP table
-        dp = [[None for _ in range(self.height)] for _ in range(self.width)]
+        energy = self._energy_cache
+        moves = np.empty((self.height - 1, self.width), dtype=np.int8)
+        cost = energy[-1].copy()
 
-        # Fill first row of DP table
-        for i in range(self.width):
-            dp[i][0] = (self._get_energy((i, 0)), [(i, 0)])
+        # The row below, padded so that the edge columns never move outwards
+        below = np.full(self.width + 2, np.iinfo(np.int64).max)
+        for row in range(self.height - 2, -1, -1):
+            below[1:-1] = cost
+            left, middle, right = below[:-2], below[1:-1], below[2:]
+            cheapest = np.minimum(np.minimum(left, middle), right)
+            moves[row] = np.where(
+                left == cheapest, -1, np.where(middle == cheapest, 0, 1)
+            )
+            cost = energy[row] + cheapest
 
-        # Fill DP table for each pixel in the image
+        # Follow the moves down from the cheapest top pixel
+        col = int(np.argmin(cost))
+        path = [(col, 0)]
         for row in range(1, self.height):
-            for col in range(self.width):
-                seam_choices = []
-
-                # Check upper-left, upper, and upper-right pixels to find
-                # the least costly seam so far
-                for col_offset in (-1, 0, 1):
-                    previous_col = col + col_offset
-                    previous_row = row - 1
-
-                    # Make sure desired pixel is in bounds
-                    if not self._in_bounds((previous_col, previous_row)):
-                        continue
-
-                    seam_choices.append(dp[previous_col][previous_row])
-
-                # Choose least costly seam from the upper pixels
-                old_cost, old_path = min(seam_choices)
-
-                # Update table at current row & col
-                dp[col][row] = (
-                    old_cost + self._get_energy((col, row)),
-                    old_path.copy() + [(col, row)],
-                )
-
-        # Return least costly seam from bottom row
-        bottom_row = [dp[i][self.height - 1] for i in range(self.width)]
-        _, best_path = min(bottom_row)
-        return best_path
+            col += int(moves[row - 1, col])
+            path.append((col, row))
+        return path
 
     def _get_energy(self, pixel: Pixel) -> int:
         """
-        Return the energy value of a pixel and memoize the result, if not already memoized.
+        Return the energy value of a pixel from the energy map.
         """
 
         col, row = pixel
-
-        if self._energy_cache[col][row] is None:
-            self._energy_cache[col][row] = self.energy(col, row)
-
-        return self._energy_cache[col][row]
+        return int(self._energy_cache[row, col])
 
     def _in_bounds(self, pixel: Pixel) -> bool:
         col, row = pixel
@@ -1,7 +1,18 @@
+import itertools
+import os
+import tempfile
 import unittest
 import sys
+from math import inf
+
+import numpy as np
+from PIL import Image
+
+from carving import CarvingSession, SeamIndex, seam_order
+from imagematrix import ImageMatrix, SeamError
 from resizeable_image import ResizeableImage
 
+
 class TestImage(unittest.TestCase):
     def test_super_small(self):
         self.image_test('10x10_white.png', 20000)
@@ -28,6 +39,332 @@ class TestImage(unittest.TestCase):
         # Make sure the energy of the seam matches what we expect.
         total = sum([image.energy(coord[0], coord[1]) for coord in seam])
         self.assertEqual(total, expected_cost)
-            
+
+
+class TestImageMatrix(unittest.TestCase):
+    def setUp(self):
+        pixels = np.arange(4 * 3 * 3, dtype=np.uint8).reshape(3, 4, 3)
+        self.image = ImageMatrix(Image.fromarray(pixels))
+
+    def test_pixels(self):
+        self.assertEqual((self.image.width, self.image.height), (4, 3))
+        self.assertEqual(self.image[1, 2], (27, 28, 29))
+        self.image[1, 2] = (1, 2, 3)
+        self.assertEqual(self.image[1, 2], (1, 2, 3))
+
+    def test_pixels_outside(self):
+        for coords in ((-1, 0), (0, -1), (4, 0), (0, 3)):
+            self.assertRaises(KeyError, self.image.__getitem__, coords)
+            self.assertRaises(KeyError, self.image.__setitem__, coords, (1, 2, 3))
+        self.assertEqual(self.image[3, 0], (9, 10, 11))
+
+    def test_remove_seam(self):
+        self.image.remove_seam([(0, 0), (1, 1), (3, 2)])
+        self.assertEqual(self.image.width, 3)
+        self.assertEqual([self.image[i, 1] for i in range(3)],
+                         [(12, 13, 14), (18, 19, 20), (21, 22, 23)])
+        self.assertEqual(self.image[2, 2], (30, 31, 32))
+        self.assertEqual(self.image.image().size, (3, 3))
+
+    def test_bad_seams(self):
+        for seam in ([(0, 0), (0, 1)], [(0, 0), (0, 0), (0, 1), (0, 2)],
+                     [(0, 0), (0, 1), (0, 3)], [(0, 0), (0, 1), (4, 2)]):
+            self.assertRaises(SeamError, self.image.remove_seam, seam)
+        self.assertEqual(self.image.width, 4)
+        for seam, message in (([(0, 3), (0, 0)], 'nonexistent row 3'),
+                              ([(0, 1), (5, 1)], 'repeated row 1'),
+                              ([(0, 0), (4, 1), (0, 7)], 'nonexistent column 4'),
+                              ([(1, 1)], 'missed rows 0,2')):
+            with self.assertRaises(SeamError) as error:
+                self.image.remove_seam(seam)
+            self.assertTrue(str(error.exception).endswith(message))
+
+    def test_remove_seams(self):
+        """Removals in place match copying out every other pixel"""
+        random = np.random.default_rng(0)
+        pixels = random.integers(0, 256, (9, 12, 3), dtype=np.uint8)
+        image = ImageMatrix(Image.fromarray(pixels))
+        while image.width > 1:
+            columns = np.clip(random.integers(-1, 2, 9).cumsum() + 5,
+                              0, image.width - 1)
+            keep = np.ones(pixels.shape[:2], dtype=bool)
+            keep[np.arange(9), columns] = False
+            pixels = pixels[keep].reshape(9, -1, 3)
+            image.remove_seam([(i, j) for j, i in enumerate(columns)])
+            self.assertTrue((image.pixels == pixels).all())
+            self.assertTrue((np.asarray(image.image()) == pixels).all())
+
+    def test_energy_map(self):
+        random = np.random.default_rng(0)
+        for height, width in ((1, 1), (2, 5), (3, 3), (17, 23)):
+            pixels = random.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            image = ImageMatrix(Image.fromarray(pixels))
+            energy = image.energy_map()
+            self.assertEqual(energy.shape, (height, width))
+            for i in range(width):
+                for j in range(height):
+                    self.assertEqual(energy[j, i], image.energy(i, j))
+
+    def test_energies(self):
+        """energies() agrees with energy_map() anywhere, edges included"""
+        random = np.random.default_rng(8)
+        for height, width in ((1, 1), (2, 5), (3, 3), (17, 23)):
+            pixels = random.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            image = ImageMatrix(Image.fromarray(pixels))
+            cols = random.integers(0, width, 200)
+            rows = random.integers(0, height, 200)
+            # Every corner, whatever the random draw
+            cols[:4], rows[:4] = [0, 0, width-1, width-1], [0, height-1, 0, height-1]
+            self.assertTrue((image.energies(cols, rows) ==
+                             image.energy_map()[rows, cols]).all())
+
+    def test_energy_map_processes(self):
+        """Bands computed in a process pool stitch into the same map"""
+        random = np.random.default_rng(6)
+        pixels = random.integers(0, 256, (150, 20, 3), dtype=np.uint8)
+        image = ImageMatrix(Image.fromarray(pixels))
+        self.assertTrue((image.energy_map(processes=2) == image.energy_map()).all())
+
+
+def reference_seam(image):
+    """The original DP, which keeps the whole (cost, path) in every cell."""
+    rows = [[(image.energy(i, 0), [(i, 0)]) for i in range(image.width)]]
+    for j in range(1, image.height):
+        above = rows[-1]
+        rows.append([])
+        for i in range(image.width):
+            cost, path = min(above[max(i - 1, 0):i + 2])
+            rows[-1].append((cost + image.energy(i, j), path + [(i, j)]))
+    return min(rows[-1])[1]
+
+
+class TestBestSeam(unittest.TestCase):
+    def test_ties(self):
+        """Few distinct colors make many equally cheap seams"""
+        random = np.random.default_rng(0)
+        for _ in range(100):
+            height, width = random.integers(1, 12, 2)
+            pixels = random.integers(0, 2, (height, width, 3)) * 255
+            image = ResizeableImage(Image.fromarray(pixels.astype(np.uint8)))
+            self.assertEqual(image.best_seam(), reference_seam(image))
+
+
+class TestCarvingSession(unittest.TestCase):
+    def test_matches_fresh_image(self):
+        """Every seam matches best_seam() of the image as it is by then"""
+        random = np.random.default_rng(1)
+        for _ in range(30):
+            height, width = random.integers(1, 12, 2)
+            pixels = random.integers(0, 2, (height, width, 3)) * 255
+            image = ResizeableImage(Image.fromarray(pixels.astype(np.uint8)))
+            session = CarvingSession(image)
+            while image.width > 0:
+                fresh = ResizeableImage(image.image())
+                self.assertTrue((session.energy == fresh.energy_map()).all())
+                self.assertEqual(session.remove_best_seam(), fresh.best_seam())
+
+    def test_resize_to(self):
+        random = np.random.default_rng(2)
+        pixels = random.integers(0, 2, (8, 10, 3)).astype(np.uint8) * 255
+        image = ResizeableImage(Image.fromarray(pixels))
+        expected = ResizeableImage(Image.fromarray(pixels))
+        for _ in range(6):
+            expected.remove_best_seam()
+        calls = []
+        stats = image.resize_to(4, lambda done, total: calls.append((done, total)))
+        self.assertEqual(calls, [(done, 6) for done in range(1, 7)])
+        self.assertEqual(stats['seams'], 6)
+        self.assertTrue((image.pixels == expected.pixels).all())
+        self.assertEqual(image.remove_seams(0)['seams'], 0)
+        self.assertRaises(ValueError, image.resize_to, 5)
+        self.assertRaises(ValueError, image.remove_seams, -1)
+        image.resize_to(0)
+        self.assertEqual(image.width, 0)
+
+
+class TestEnlarge(unittest.TestCase):
+    def setUp(self):
+        random = np.random.default_rng(4)
+        self.pixels = random.integers(0, 3, (6, 8, 3)).astype(np.uint8) * 120
+
+    def test_seam_order(self):
+        """Step s of the map is the s-th seam removed, in original columns"""
+        image = ResizeableImage(Image.fromarray(self.pixels))
+        order = seam_order(image, 5)
+        self.assertEqual(image.width, 8)
+        columns = [list(range(8)) for _ in range(6)]
+        for step in range(5):
+            for i, j in image.best_seam():
+                self.assertEqual(order[j, columns[j].pop(i)], step)
+            image.remove_best_seam()
+        self.assertEqual((order >= 0).sum(), 5 * 6)
+
+    def test_enlarge_to(self):
+        image = ResizeableImage(Image.fromarray(self.pixels))
+        chosen = seam_order(image, 3) >= 0
+        image.enlarge_to(11)
+        self.assertEqual((image.width, image.height), (11, 6))
+        for j in range(6):
+            i = 0
+            for col in range(8):
+                self.assertEqual(image[i, j], tuple(self.pixels[j, col]))
+                i += 1
+                if chosen[j, col]:
+                    right = self.pixels[j, min(col + 1, 7)].astype(int)
+                    average = (self.pixels[j, col] + right) // 2
+                    self.assertEqual(image[i, j], tuple(average))
+                    i += 1
+        image.enlarge_to(30)
+        self.assertEqual(image.width, 30)
+        self.assertRaises(ValueError, image.enlarge_to, 29)
+
+
+class TestSeamIndex(unittest.TestCase):
+    def test_render(self):
+        """Every width renders as removing that many seams would leave it"""
+        random = np.random.default_rng(5)
+        pixels = random.integers(0, 3, (6, 8, 3)).astype(np.uint8) * 120
+        image = ResizeableImage(Image.fromarray(pixels))
+        index = SeamIndex.build(image)
+        self.assertEqual(index.order.dtype, np.uint16)
+        for width in range(8, 0, -1):
+            self.assertTrue((index.render(width) == image.pixels).all())
+            if width > 1:
+                image.remove_best_seam()
+        self.assertEqual(index.render(0).shape, (6, 0, 3))
+        self.assertRaises(ValueError, index.render, 9)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'index.npz')
+            index.save(filename)
+            loaded = SeamIndex.load(filename)
+        self.assertTrue((loaded.order == index.order).all())
+        self.assertTrue((loaded.image(3).pixels == index.render(3)).all())
+
+
+class TestRetarget(unittest.TestCase):
+    def setUp(self):
+        random = np.random.default_rng(3)
+        self.pixels = random.integers(0, 3, (7, 9, 3)).astype(np.uint8) * 120
+
+    def image(self, pixels=None):
+        if pixels is None:
+            pixels = self.pixels
+        return ResizeableImage(Image.fromarray(np.ascontiguousarray(pixels)))
+
+    def test_horizontal_seam(self):
+        """A horizontal seam is a vertical seam of the transposed image"""
+        image, flipped = self.image(), self.image(self.pixels.transpose(1, 0, 2))
+        seam = flipped.best_seam()
+        self.assertEqual(image.best_horizontal_seam(), [(j, i) for i, j in seam])
+        self.assertTrue((image.transposed().energy_map() == flipped.energy_map()).all())
+        image.remove_best_horizontal_seam()
+        flipped.remove_seam(seam)
+        self.assertEqual((image.width, image.height), (9, 6))
+        self.assertTrue((image.pixels == flipped.pixels.transpose(1, 0, 2)).all())
+
+    def replay(self, order):
+        image, cost = self.image(), 0
+        for kind in order:
+            view = image if kind == 'v' else image.transposed()
+            energy = view.energy_map()
+            seam = view.best_seam()
+            cost += sum(energy[j, i] for i, j in seam)
+            if kind == 'v':
+                image.remove_seam(seam)
+            else:
+                image.remove_horizontal_seam([(j, i) for i, j in seam])
+        return image, cost
+
+    def test_greedy(self):
+        image = self.image()
+        stats = image.retarget(5, 4)
+        self.assertEqual((image.width, image.height), (5, 4))
+        self.assertEqual((stats['vertical'], stats['horizontal']), (4, 3))
+        expected, cost = self.replay(stats['order'])
+        self.assertEqual(stats['cost'], cost)
+        self.assertTrue((image.pixels == expected.pixels).all())
+
+    def test_greedy_choices(self):
+        """Every step removes whichever best seam is cheaper at that point"""
+        order = self.image().retarget(5, 4)['order']
+        image = self.image()
+        for step, kind in enumerate(order):
+            costs = {}
+            if image.width > 5:
+                seam = image.best_seam()
+                costs['v'] = sum(image.energy(i, j) for i, j in seam)
+            if image.height > 4:
+                seam = image.best_horizontal_seam()
+                costs['h'] = sum(image.energy(i, j) for i, j in seam)
+            # Ties go to the vertical seam
+            cheaper = 'v' if costs.get('v', inf) <= costs.get('h', inf) else 'h'
+            self.assertEqual(kind, cheaper, 'step %d' % step)
+            if kind == 'v':
+                image.remove_best_seam()
+            else:
+                image.remove_best_horizontal_seam()
+
+    def test_optimal(self):
+        image = self.image()
+        stats = image.retarget(5, 4, order='optimal')
+        self.assertEqual((image.width, image.height), (5, 4))
+        expected, cost = self.replay(stats['order'])
+        self.assertEqual(stats['cost'], cost)
+        self.assertTrue((image.pixels == expected.pixels).all())
+
+    def carve(self, image, kind):
+        """A copy of image without its best seam of one kind, and its cost."""
+        image = ResizeableImage(image.image())
+        view = image if kind == 'v' else image.transposed()
+        energy = view.energy_map()
+        seam = view.best_seam()
+        if kind == 'v':
+            image.remove_seam(seam)
+        else:
+            image.remove_horizontal_seam([(j, i) for i, j in seam])
+        return image, sum(energy[j, i] for i, j in seam)
+
+    def transport_map(self, rows, cols):
+        """The transport map filled cell by cell from fresh images; returns
+        the cost and order of its corner, with ties going to 'v'."""
+        cells = {(0, 0): (0, '', self.image())}
+        for r in range(rows + 1):
+            for c in range(cols + 1):
+                options = []
+                if r > 0:
+                    cost, order, image = cells[r - 1, c]
+                    image, seam = self.carve(image, 'h')
+                    options.append((cost + seam, 1, order + 'h', image))
+                if c > 0:
+                    cost, order, image = cells[r, c - 1]
+                    image, seam = self.carve(image, 'v')
+                    options.append((cost + seam, 0, order + 'v', image))
+                if options:
+                    cost, _, order, image = min(options, key=lambda o: o[:2])
+                    cells[r, c] = (cost, order, image)
+        return cells[rows, cols][:2]
+
+    def test_transport_map(self):
+        """The map of Avidan and Shamir, bounded below by every order"""
+        random = np.random.default_rng(7)
+        for _ in range(12):
+            height, width = random.integers(4, 8, 2)
+            self.pixels = random.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            rows, cols = random.integers(1, 4, 2)
+            stats = self.image().retarget(width - cols, height - rows, 'optimal')
+            self.assertEqual((stats['cost'], stats['order']),
+                             self.transport_map(rows, cols))
+            # One image per cell may miss the cheapest order, never beat it
+            orders = set(itertools.permutations('v' * cols + 'h' * rows))
+            self.assertGreaterEqual(
+                stats['cost'], min(self.replay(order)[1] for order in orders))
+
+    def test_bad_sizes(self):
+        for width, height, order in ((10, 4, 'greedy'), (5, 0, 'greedy'),
+                                     (5, 4, 'random')):
+            self.assertRaises(ValueError, self.image().retarget, width, height, order)
+
+
 if __name__ == '__main__':
     unittest.main(argv = sys.argv + ['--verbose'])